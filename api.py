@@ -0,0 +1,351 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from rich.console import Console
+
+from dados import (
+    ANOS,
+    CODE_STATE_PADRAO,
+    _normalize_value,
+    assinatura_superintendencias_geo,
+    calcular_indicadores_por_ano,
+    caminho_particao,
+    carregar_dados,
+    escolher_estado,
+    ler_manifesto,
+    montar_tabela_municipios,
+    montar_tabela_superintendencias,
+    preparar_dados_mapa_municipios,
+    preparar_dados_mapa_superintendencias,
+    versao_dados,
+)
+from estados import SIGLAS_UF, codigo_estado
+
+console = Console()
+
+# Parâmetro de consulta que identifica a entidade em cada rota
+PARAMETRO_ENTIDADE = {
+    "/municipios": "cod_ibge",
+    "/municipios.geojson": "cod_ibge",
+    "/superintendencias": "superintendencia",
+    "/superintendencias.geojson": "superintendencia",
+}
+
+# ============================================================================
+# PRÉ-CÁLCULO DAS RESPOSTAS
+# ============================================================================
+
+
+def _chave_municipio(cod_ibge):
+    return str(int(cod_ibge))
+
+
+def _chave_superintendencia(nome):
+    return _normalize_value(nome)
+
+
+def _montar_resposta(corpo, tipo="application/json"):
+    """Monta resposta pronta para envio: corpo, corpo gzip e um ETag por codificação."""
+    corpo = corpo.encode("utf-8")
+    hash_corpo = hashlib.sha1(corpo).hexdigest()[:20]
+    return {
+        "corpo": corpo,
+        "gzip": gzip.compress(corpo, compresslevel=9),
+        # Representações diferentes exigem ETags fortes diferentes (RFC 9110)
+        "etag": f'"{hash_corpo}"',
+        "etag_gzip": f'"{hash_corpo}-gz"',
+        "tipo": tipo + "; charset=utf-8",
+    }
+
+
+def _aceita_gzip(accept_encoding):
+    """Indica se o cabeçalho Accept-Encoding aceita gzip (q > 0)."""
+    aceito = None
+    for item in accept_encoding.split(","):
+        codificacao, *parametros = [parte.strip() for parte in item.split(";")]
+        qualidade = 1.0
+        for parametro in parametros:
+            nome, _, valor = parametro.partition("=")
+            if nome.strip().lower() == "q":
+                try:
+                    qualidade = float(valor)
+                except ValueError:
+                    qualidade = 0.0
+        codificacao = codificacao.lower()
+        # Menção explícita a gzip prevalece sobre o curinga
+        if codificacao in ("gzip", "x-gzip"):
+            return qualidade > 0
+        if codificacao == "*":
+            aceito = qualidade > 0
+    return bool(aceito)
+
+
+def _registrar_registros(respostas, rota, df, coluna_chave, funcao_chave, ano=None):
+    """Registra a lista completa e uma resposta por entidade."""
+    respostas[(rota, None, ano)] = _montar_resposta(
+        df.to_json(orient="records", force_ascii=False)
+    )
+    chaves = df[coluna_chave].map(funcao_chave)
+    for chave, grupo in df.groupby(chaves, sort=False):
+        respostas[(rota, chave, ano)] = _montar_resposta(
+            grupo.to_json(orient="records", force_ascii=False)
+        )
+
+
+def _registrar_geojson(respostas, rota, gdf, coluna_chave, funcao_chave, ano=None):
+    """Registra o GeoJSON completo e um GeoJSON por entidade."""
+    respostas[(rota, None, ano)] = _montar_resposta(
+        gdf.to_json(drop_id=True), tipo="application/geo+json"
+    )
+    chaves = gdf[coluna_chave].map(funcao_chave)
+    for chave, grupo in gdf.groupby(chaves, sort=False):
+        respostas[(rota, chave, ano)] = _montar_resposta(
+            grupo.to_json(drop_id=True), tipo="application/geo+json"
+        )
+
+
+def precalcular_respostas(code_state=CODE_STATE_PADRAO, versao=None):
+    """Calcula todas as respostas da API a partir das mesmas agregações do painel.
+
+    As chaves são ``(rota, entidade, ano)``; ``entidade`` e ``ano`` são ``None``
+    quando a consulta não filtra por eles. As rotas de superintendências só
+    existem para estados com mapeamento CETRAN.
+    """
+    if versao is None:
+        versao = versao_dados(code_state)
+    sysdata = carregar_dados(code_state, versao=versao)
+    respostas = {}
+
+    # Municípios: agregado 2022-2024 e indicadores por ano
+    tabela_municipios = montar_tabela_municipios(sysdata, versao=versao)
+    info_municipios = tabela_municipios[["cod_ibge", "name_muni", "Superintendência"]]
+    tabela_municipios = tabela_municipios[
+        ["cod_ibge", "name_muni", "Superintendência"]
+        + [c for c in tabela_municipios.columns if c not in info_municipios.columns]
+    ]
+    _registrar_registros(
+        respostas, "/municipios", tabela_municipios, "cod_ibge", _chave_municipio
+    )
+
+    anuais_municipios = info_municipios.merge(
+        calcular_indicadores_por_ano(sysdata, "cod_ibge", versao=versao),
+        on="cod_ibge",
+    )
+    for ano, df_ano in anuais_municipios.groupby("ano"):
+        _registrar_registros(
+            respostas,
+            "/municipios",
+            df_ano,
+            "cod_ibge",
+            _chave_municipio,
+            ano=int(ano),
+        )
+
+    dados_municipios = preparar_dados_mapa_municipios(sysdata, versao=versao)[
+        ["cod_ibge", "geometry"]
+    ]
+    _registrar_geojson(
+        respostas,
+        "/municipios.geojson",
+        dados_municipios.merge(tabela_municipios, on="cod_ibge", how="left"),
+        "cod_ibge",
+        _chave_municipio,
+    )
+    for ano, df_ano in anuais_municipios.groupby("ano"):
+        _registrar_geojson(
+            respostas,
+            "/municipios.geojson",
+            dados_municipios.merge(df_ano, on="cod_ibge", how="left"),
+            "cod_ibge",
+            _chave_municipio,
+            ano=int(ano),
+        )
+
+    # Superintendências (DETRAN-SP): agregado 2022-2024 e indicadores por ano
+    if not sysdata["Superintendência"].notna().any():
+        return respostas
+    tabela_superintendencias = montar_tabela_superintendencias(sysdata, versao=versao)
+    _registrar_registros(
+        respostas,
+        "/superintendencias",
+        tabela_superintendencias,
+        "Superintendência",
+        _chave_superintendencia,
+    )
+
+    anuais_superintendencias = calcular_indicadores_por_ano(
+        sysdata, "Superintendência", versao=versao
+    )
+    for ano, df_ano in anuais_superintendencias.groupby("ano"):
+        _registrar_registros(
+            respostas,
+            "/superintendencias",
+            df_ano,
+            "Superintendência",
+            _chave_superintendencia,
+            ano=int(ano),
+        )
+
+    dados_superintendencias = preparar_dados_mapa_superintendencias(
+        sysdata, assinatura_superintendencias_geo(), versao=versao
+    )[["Superintendência", "geometry"]]
+    _registrar_geojson(
+        respostas,
+        "/superintendencias.geojson",
+        dados_superintendencias.merge(
+            tabela_superintendencias, on="Superintendência", how="left"
+        ),
+        "Superintendência",
+        _chave_superintendencia,
+    )
+    for ano, df_ano in anuais_superintendencias.groupby("ano"):
+        _registrar_geojson(
+            respostas,
+            "/superintendencias.geojson",
+            dados_superintendencias.merge(df_ano, on="Superintendência", how="left"),
+            "Superintendência",
+            _chave_superintendencia,
+            ano=int(ano),
+        )
+
+    return respostas
+
+
+# ============================================================================
+# SERVIDOR HTTP
+# ============================================================================
+
+
+def criar_handler(respostas, ultima_modificacao):
+    """Cria o handler HTTP somente leitura sobre as respostas pré-calculadas."""
+    last_modified = formatdate(ultima_modificacao, usegmt=True)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Cabeçalhos e corpo saem em escritas separadas; com o algoritmo de
+        # Nagle, cada resposta numa conexão mantida esperaria o ACK atrasado
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            # Sem log por requisição para não limitar a vazão
+            pass
+
+        def _enviar_erro(self, status, mensagem):
+            corpo = json.dumps({"erro": mensagem}, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(corpo)
+
+        def _nao_modificado(self, etag):
+            if_none_match = self.headers.get("If-None-Match")
+            if if_none_match is not None:
+                etags = [etag.strip() for etag in if_none_match.split(",")]
+                return etag in etags or "*" in etags
+            if_modified_since = self.headers.get("If-Modified-Since")
+            if if_modified_since is not None:
+                try:
+                    data = parsedate_to_datetime(if_modified_since).timestamp()
+                except (TypeError, ValueError):
+                    return False
+                return int(ultima_modificacao) <= data
+            return False
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path not in PARAMETRO_ENTIDADE:
+                self._enviar_erro(404, f"Rota não encontrada: {url.path}")
+                return
+
+            consulta = parse_qs(url.query)
+            entidade = consulta.get(PARAMETRO_ENTIDADE[url.path], [None])[0]
+            if entidade is not None:
+                entidade = _normalize_value(entidade)
+            ano = consulta.get("ano", [None])[0]
+            if ano is not None:
+                try:
+                    ano = int(ano)
+                except ValueError:
+                    self._enviar_erro(400, f"Ano inválido: {ano}")
+                    return
+
+            resposta = respostas.get((url.path, entidade, ano))
+            if resposta is None:
+                self._enviar_erro(404, "Nenhum dado para os filtros informados")
+                return
+
+            usar_gzip = _aceita_gzip(self.headers.get("Accept-Encoding", ""))
+            etag = resposta["etag_gzip"] if usar_gzip else resposta["etag"]
+
+            if self._nao_modificado(etag):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                self.send_header("Cache-Control", "public, max-age=300")
+                self.send_header("Vary", "Accept-Encoding")
+                self.end_headers()
+                return
+
+            corpo = resposta["gzip"] if usar_gzip else resposta["corpo"]
+            self.send_response(200)
+            self.send_header("Content-Type", resposta["tipo"])
+            self.send_header("Content-Length", str(len(corpo)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.send_header("Cache-Control", "public, max-age=300")
+            self.send_header("Vary", "Accept-Encoding")
+            if usar_gzip:
+                self.send_header("Content-Encoding", "gzip")
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(corpo)
+
+        do_HEAD = do_GET
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=(
+            "API JSON somente leitura dos indicadores por município e "
+            "superintendência. Rotas: /municipios, /superintendencias, "
+            "/municipios.geojson, /superintendencias.geojson; filtros: ano, "
+            "cod_ibge, superintendencia."
+        )
+    )
+    parser.add_argument("--host", default="0.0.0.0", help="Endereço (padrão: 0.0.0.0)")
+    parser.add_argument("--porta", type=int, default=8000, help="Porta (padrão: 8000)")
+    parser.add_argument(
+        "--estado",
+        type=codigo_estado,
+        default=None,
+        help="Código IBGE ou sigla do estado (padrão: SP, se publicado)",
+    )
+    args = parser.parse_args()
+
+    manifesto = ler_manifesto()
+    try:
+        code_state = escolher_estado(args.estado, manifesto)
+    except (FileNotFoundError, ValueError) as erro:
+        parser.error(str(erro))
+    versao = versao_dados(code_state, manifesto)
+    console.print(
+        f"Pré-calculando respostas de {SIGLAS_UF[code_state]} (dados {versao})"
+    )
+    respostas = precalcular_respostas(code_state, versao=versao)
+    console.print(f"{len(respostas)} respostas prontas (anos: {ANOS})")
+
+    servidor = ThreadingHTTPServer(
+        (args.host, args.porta),
+        criar_handler(respostas, os.path.getmtime(caminho_particao(versao))),
+    )
+    console.print(f"API disponível em http://{args.host}:{args.porta}")
+    servidor.serve_forever()
@@ -0,0 +1,71 @@
+import argparse
+import time
+from rich.console import Console
+
+from cache_disco import estatisticas, remover_nao_usados
+from dados import (
+    diretorio_cache,
+    ler_manifesto,
+    listar_estados,
+    preaquecer,
+    versao_dados,
+)
+from estados import SIGLAS_UF
+
+console = Console()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=(
+            "Preenche o cache em disco da versão publicada (tabelas e camadas dos "
+            "mapas de todos os estados e indicadores) e apaga os resultados "
+            "obsoletos. Rode antes de a réplica receber tráfego."
+        )
+    )
+    parser.add_argument(
+        "--versao",
+        default=None,
+        help=(
+            "Só aquece se esta ainda for a versão publicada (usado pela recarga "
+            "do painel)"
+        ),
+    )
+    args = parser.parse_args()
+
+    manifesto = ler_manifesto()
+    if manifesto is None:
+        raise FileNotFoundError(
+            "Nenhuma publicação de dados encontrada. Rode o sysdata.py."
+        )
+    if args.versao is not None and manifesto["versao"] != args.versao:
+        raise SystemExit(
+            f"A versão publicada agora é {manifesto['versao']}, não {args.versao}"
+        )
+
+    console.print(f"Aquecendo a versão {manifesto['versao']}")
+    inicio = time.perf_counter()
+    inicio_relogio = time.time()
+    estados = listar_estados(manifesto)
+    for code_state in estados:
+        inicio_estado = time.perf_counter()
+        preaquecer(manifesto, [code_state])
+        console.print(
+            f"[{SIGLAS_UF.get(code_state, code_state)}] "
+            f"{time.perf_counter() - inicio_estado:.2f}s"
+        )
+
+    # Tudo o que o painel usa nesta versão foi lido ou gravado acima; o resto é
+    # de outro código ou de shapes que mudaram. Só aqui, e não a cada gravação,
+    # para que réplicas com códigos diferentes não apaguem o cache umas das outras
+    removidos = 0
+    if estados:
+        removidos = remover_nao_usados(
+            diretorio_cache(versao_dados(estados[0], manifesto)), inicio_relogio
+        )
+
+    console.print(
+        f"Cache pronto em {time.perf_counter() - inicio:.2f}s "
+        f"({estatisticas['faltas']} entradas calculadas, "
+        f"{estatisticas['acertos']} já existentes, {removidos} obsoletas removidas)"
+    )
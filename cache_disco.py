@@ -0,0 +1,141 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+
+# ============================================================================
+# CACHE EM DISCO POR VERSÃO DOS DADOS
+# ============================================================================
+#
+# Complementa o st.cache_data (memória do processo): o resultado fica em
+# data/versoes/<versão>/cache/, então sobrevive a reinícios e deploys e some
+# junto com a versão. A chave inclui o código dos módulos de cálculo, para que
+# uma mudança no código não sirva resultados antigos. Arquivos externos à
+# publicação entram na chave como argumento (ver ``assinatura_arquivos``).
+#
+# Resultados obsoletos não são apagados ao gravar: durante um deploy, réplicas
+# com códigos diferentes gravam no mesmo diretório e apagariam umas às outras.
+# A limpeza fica com o aquecer.py (``remover_nao_usados``).
+
+MODULOS_CALCULO = [
+    "dados.py",
+    "espacial.py",
+    "estratos.py",
+    "mapas.py",
+    "padronizacao.py",
+]
+
+_DIR_MODULOS = os.path.dirname(os.path.abspath(__file__))
+
+
+def _versao_codigo():
+    conteudo = hashlib.sha1()
+    for modulo in MODULOS_CALCULO:
+        with open(os.path.join(_DIR_MODULOS, modulo), "rb") as f:
+            conteudo.update(f.read())
+    return conteudo.hexdigest()[:12]
+
+
+VERSAO_CODIGO = _versao_codigo()
+
+# Acertos e faltas desde o início do processo (relatório de partida a frio)
+estatisticas = {"acertos": 0, "faltas": 0}
+
+
+# Arquivos de cache lidos ou gravados por este processo
+arquivos_usados = set()
+
+
+def assinatura_arquivos(paths):
+    """Data de modificação e tamanho de arquivos externos (None se ausentes).
+
+    Passada como argumento às funções em cache que leem esses arquivos, faz a
+    chave mudar quando eles mudam.
+    """
+    assinatura = []
+    for path in paths:
+        try:
+            info = os.stat(path)
+            assinatura.append((path, info.st_mtime_ns, info.st_size))
+        except FileNotFoundError:
+            assinatura.append((path, None, None))
+    return tuple(assinatura)
+
+
+def remover_nao_usados(diretorio, anteriores_a):
+    """Apaga os resultados não usados neste processo e anteriores a ``anteriores_a``.
+
+    Chamada após aquecer todos os estados e indicadores de uma versão: o que
+    sobra é de outro código ou de arquivos externos que mudaram. Resultados
+    gravados por outras réplicas durante o aquecimento são preservados.
+    """
+    removidos = 0
+    if not os.path.isdir(diretorio):
+        return removidos
+    for nome_arquivo in os.listdir(diretorio):
+        path = os.path.join(diretorio, nome_arquivo)
+        if not nome_arquivo.endswith(".pkl") or path in arquivos_usados:
+            continue
+        try:
+            if os.path.getmtime(path) < anteriores_a:
+                os.remove(path)
+                removidos += 1
+        except FileNotFoundError:
+            pass
+    return removidos
+
+
+def persistir_em_disco(diretorio_cache):
+    """Decorador que guarda em disco o retorno de funções com argumento ``versao``.
+
+    ``diretorio_cache(versao)`` indica onde gravar. Como no st.cache_data,
+    argumentos iniciados por "_" não entram na chave.
+    """
+
+    def decorador(funcao):
+        assinatura = inspect.signature(funcao)
+
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            argumentos = assinatura.bind(*args, **kwargs)
+            argumentos.apply_defaults()
+            versao = argumentos.arguments["versao"]
+            if versao is None:
+                return funcao(*args, **kwargs)
+
+            chave = repr(
+                sorted(
+                    (nome, valor)
+                    for nome, valor in argumentos.arguments.items()
+                    if not nome.startswith("_")
+                )
+            )
+            nome_arquivo = (
+                f"{funcao.__name__}-{VERSAO_CODIGO}-"
+                f"{hashlib.sha1(chave.encode()).hexdigest()[:16]}.pkl"
+            )
+            diretorio = diretorio_cache(versao)
+            path_cache = os.path.join(diretorio, nome_arquivo)
+            arquivos_usados.add(path_cache)
+
+            if os.path.exists(path_cache):
+                with open(path_cache, "rb") as f:
+                    resultado = pickle.load(f)
+                estatisticas["acertos"] += 1
+                return resultado
+
+            resultado = funcao(*args, **kwargs)
+            estatisticas["faltas"] += 1
+            # Gravação atômica: réplicas e threads podem gravar a mesma chave
+            os.makedirs(diretorio, exist_ok=True)
+            path_temporario = f"{path_cache}.{os.getpid()}-{threading.get_ident()}.tmp"
+            with open(path_temporario, "wb") as f:
+                pickle.dump(resultado, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path_temporario, path_cache)
+            return resultado
+
+        return envoltorio
+
+    return decorador
@@ -0,0 +1,1080 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import unicodedata
+import json
+import os
+
+from cache_disco import assinatura_arquivos, persistir_em_disco
+from espacial import (
+    TOLERANCIA_SIMPLIFICACAO,
+    calcular_agrupamentos,
+    construir_indice_espacial,
+    matriz_vizinhanca,
+)
+from estratos import classificar_faixa_etaria
+from padronizacao import agrupar_arrays, calcular_taxas_padronizadas, montar_arrays
+
+# Publicação do sysdata.py: o manifesto aponta a versão atual, gravada em
+# data/versoes/<versão>/ e nunca alterada depois de publicada
+PATH_MANIFESTO = "data/manifesto.json"
+DIR_VERSOES = "data/versoes"
+
+# Artefatos de cada versão, particionados por estado: <dir>/code_state=<código>/...
+DIR_SYSDATA = "sysdata"
+DIR_DETALHE = "detalhe"
+DIR_ESTRUTURA = "estrutura"
+DIR_VIZINHANCA = "vizinhanca"
+CODE_STATE_PADRAO = 35
+
+# Tentar diferentes nomes possíveis para o arquivo de superintendências
+POSSIBLE_PATHS_SUPERINTENDENCIAS = [
+    "data/superintendencias_detran.gpkg",
+    "data/Superintendencias_DETRAN.gpkg",
+    "data/Superintendencias_detran.gpkg",
+]
+
+ANOS = [2022, 2023, 2024]
+
+# Limites dos caches em memória. As chaves incluem a versão dos dados; sem
+# limite, cada publicação nova se somaria às anteriores no processo. Partições
+# e detalhes (os maiores objetos) são contados por estado.
+MAX_ESTADOS_EM_MEMORIA = 4
+MAX_ENTRADAS_CACHE = 64
+
+# Métricas selecionáveis nas tabelas e mapas: coluna -> (título, rótulo curto)
+METRICAS = {
+    "taxa_media": ("Taxa Média de Óbitos", "Taxa Média"),
+    "taxa_padronizada_direta": ("Taxa Padronizada Direta", "Taxa Padr. Direta"),
+    "taxa_padronizada_indireta": ("Taxa Padronizada Indireta", "Taxa Padr. Indireta"),
+}
+
+# Tabelas paginadas: colunas usadas na busca por nome e nos filtros
+COLUNAS_BUSCA = {
+    "municipios": ["Município", "Superintendência", "Código IBGE"],
+    "superintendencias": ["Superintendência"],
+}
+COLUNAS_FILTRO = {
+    "municipios": ["Superintendência"],
+    "superintendencias": [],
+}
+
+# Colunas das taxas padronizadas levadas às tabelas e mapas
+COLUNAS_PADRONIZADAS = [
+    "taxa_padronizada_direta",
+    "taxa_padronizada_direta_ic_inf",
+    "taxa_padronizada_direta_ic_sup",
+    "rmp",
+    "rmp_ic_inf",
+    "rmp_ic_sup",
+    "taxa_padronizada_indireta",
+    "taxa_padronizada_indireta_ic_inf",
+    "taxa_padronizada_indireta_ic_sup",
+]
+
+# ============================================================================
+# TEXTOS DO PAINEL
+# ============================================================================
+
+TITULO_PAGINA = "Programa 'Piloto Consciente SP' - Diagnóstico"
+
+TEXTO_SOBRE = """
+    - Quantidade de óbitos envolvendo ocupantes de motocicleta: Infosiga, out-2025
+    - Estimativa de população por município: SEADE, out-2025
+    - Taxa média de óbitos envolvendo ocupantes de motocicleta por 100.000 habitantes calculada com base na média dos anos de 2022, 2023 e 2024
+    - Variação de óbitos envolvendo ocupantes de motocicleta calculada considerando os anos de 2022 e 2024
+
+    v0.1 - 2025-11-19
+    """
+
+# ============================================================================
+# CARREGAMENTO E PREPARAÇÃO DOS DADOS
+# ============================================================================
+
+
+def _normalize_value(value: str) -> str:
+    if not isinstance(value, str):
+        return ""
+    normalized = unicodedata.normalize("NFKD", value)
+    normalized = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return normalized.lower().strip()
+
+
+def normalize_series(series: pd.Series) -> pd.Series:
+    # Cada valor distinto é normalizado uma única vez; em ASCII não há acentos
+    codigos, valores = pd.factorize(series.fillna("").astype(str))
+    normalizados = np.array(
+        [
+            v.lower().strip() if v.isascii() else _normalize_value(v)
+            for v in valores.tolist()
+        ],
+        dtype=object,
+    )
+    return pd.Series(normalizados[codigos], index=series.index, dtype=object)
+
+
+def ler_manifesto():
+    """Lê o manifesto da publicação atual (None se nada foi publicado)."""
+    if not os.path.exists(PATH_MANIFESTO):
+        return None
+    with open(PATH_MANIFESTO, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def listar_estados(manifesto=None):
+    """Lista os códigos dos estados da publicação atual."""
+    manifesto = manifesto or ler_manifesto()
+    if manifesto is None:
+        return []
+    return sorted(manifesto["estados"])
+
+
+def versao_dados(code_state=CODE_STATE_PADRAO, manifesto=None):
+    """Identifica os dados de um estado numa publicação ("<estado>@<versão>").
+
+    Compõe as chaves de cache e localiza os artefatos em ``caminho_artefato``.
+    """
+    manifesto = manifesto or ler_manifesto()
+    if manifesto is None:
+        raise FileNotFoundError(
+            f"Nenhuma publicação de dados em {PATH_MANIFESTO}. Rode o sysdata.py."
+        )
+    return f"{code_state}@{manifesto['versao']}"
+
+
+def escolher_estado(code_state=None, manifesto=None):
+    """Valida o estado pedido contra a publicação atual.
+
+    Sem ``code_state``, usa o padrão (SP) se publicado, senão o primeiro
+    estado publicado, como o seletor do painel.
+    """
+    estados = listar_estados(manifesto)
+    if not estados:
+        raise FileNotFoundError(
+            f"Nenhuma publicação de dados em {PATH_MANIFESTO}. Rode o sysdata.py."
+        )
+    if code_state is None:
+        return CODE_STATE_PADRAO if CODE_STATE_PADRAO in estados else estados[0]
+    if code_state not in estados:
+        raise ValueError(
+            f"Estado {code_state} não está na publicação atual "
+            f"(estados publicados: {estados})"
+        )
+    return code_state
+
+
+def caminho_artefato(versao, diretorio, arquivo):
+    """Caminho de um artefato do estado na versão publicada."""
+    code_state, id_versao = versao.split("@", 1)
+    return os.path.join(
+        DIR_VERSOES, id_versao, diretorio, f"code_state={code_state}", arquivo
+    )
+
+
+def caminho_particao(versao):
+    """Caminho do arquivo de dados de um estado."""
+    return caminho_artefato(versao, DIR_SYSDATA, "sysdata.parquet")
+
+
+def diretorio_cache(versao):
+    """Diretório do cache em disco da versão publicada (some junto com ela)."""
+    return os.path.join(DIR_VERSOES, versao.split("@", 1)[1], "cache")
+
+
+def calcular_taxa_obitos(dados):
+    """Taxa de óbitos por 100 mil habitantes de cada linha (município e ano)."""
+    return ((dados["quantidade_obitos"] / dados["populacao_total"]) * 100000).fillna(0)
+
+
+@st.cache_data(max_entries=MAX_ESTADOS_EM_MEMORIA)
+def carregar_dados(code_state, *, versao):
+    """Carrega e prepara os dados da partição de um estado.
+
+    ``versao`` (de ``versao_dados``) é obrigatória: é a chave do cache.
+    """
+    # geopandas só é importado quando os dados são de fato lidos
+    import geopandas as gpd
+
+    sysdata = gpd.read_parquet(caminho_particao(versao))
+    sysdata["taxa_obitos"] = calcular_taxa_obitos(sysdata)
+    sysdata["superintendencia_norm"] = normalize_series(sysdata["Superintendência"])
+    return sysdata
+
+
+def assinatura_superintendencias_geo():
+    """Data de modificação e tamanho do arquivo de superintendências.
+
+    Argumento das funções em cache que dependem dos shapes: troca o arquivo,
+    trocam as chaves em memória e em disco.
+    """
+    return assinatura_arquivos(POSSIBLE_PATHS_SUPERINTENDENCIAS)
+
+
+@st.cache_data(max_entries=MAX_ESTADOS_EM_MEMORIA)
+def carregar_superintendencias_geo(assinatura_geo):
+    """Carrega os shapes oficiais das superintendências, já simplificados.
+
+    ``assinatura_geo`` vem de ``assinatura_superintendencias_geo``. O shape do
+    DETRAN tem muito mais vértices que o necessário para o mapa; a
+    simplificação usa a mesma tolerância dos municípios no sysdata.py.
+    """
+    import geopandas as gpd
+
+    path_superintendencias_geo = None
+    for path in POSSIBLE_PATHS_SUPERINTENDENCIAS:
+        if os.path.exists(path):
+            path_superintendencias_geo = path
+            break
+
+    if path_superintendencias_geo is None:
+        raise FileNotFoundError(
+            "Arquivo de superintendências não encontrado. "
+            f"Procurou em: {POSSIBLE_PATHS_SUPERINTENDENCIAS}"
+        )
+
+    geo_superintendencias = gpd.read_file(path_superintendencias_geo)
+    geo_superintendencias["geometry"] = geo_superintendencias.geometry.simplify(
+        TOLERANCIA_SIMPLIFICACAO, preserve_topology=True
+    )
+    geo_superintendencias["superintendencia_norm"] = normalize_series(
+        geo_superintendencias["superinten"]
+    )
+    return geo_superintendencias
+
+
+# ============================================================================
+# FUNÇÕES AUXILIARES
+# ============================================================================
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+def calcular_obitos_por_ano(_data, group_by, anos=ANOS, *, versao):
+    """Calcula óbitos por ano agrupados por uma coluna."""
+    obitos_por_ano = {}
+    for ano in anos:
+        obitos = (
+            _data[_data["ano"] == ano]
+            .groupby(group_by)["quantidade_obitos"]
+            .sum()
+            .reset_index()
+            .rename(columns={"quantidade_obitos": f"obitos_{ano}"})
+        )
+        obitos_por_ano[ano] = obitos
+    return obitos_por_ano
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+def calcular_taxa_media(_data, group_by, anos=ANOS, *, versao):
+    """Calcula taxa média de óbitos agrupada por uma coluna."""
+    taxa_media = (
+        _data[_data["ano"].isin(anos)]
+        .groupby(group_by)["taxa_obitos"]
+        .mean()
+        .reset_index()
+        .rename(columns={"taxa_obitos": "taxa_media"})
+    )
+    return taxa_media
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+def calcular_taxa_por_ano(_data, group_by, ano, *, versao):
+    """Calcula taxa de óbitos para um ano específico."""
+    taxa = (
+        _data[_data["ano"] == ano]
+        .groupby(group_by)["taxa_obitos"]
+        .mean()
+        .reset_index()
+        .rename(columns={"taxa_obitos": f"taxa_{ano}"})
+    )
+    return taxa
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+def calcular_populacao_por_ano(_data, group_by, ano, *, versao):
+    """Calcula população de um ano específico agrupada por uma coluna."""
+    # Para municípios, usar first() pois cada município tem uma única população
+    # Para superintendências, usar sum() para somar populações de todos os municípios
+    if group_by == "cod_ibge":
+        populacao = (
+            _data[_data["ano"] == ano]
+            .groupby(group_by)["populacao_total"]
+            .first()
+            .reset_index()
+            .rename(columns={"populacao_total": f"populacao_{ano}"})
+        )
+    else:
+        # Para superintendências, somar populações de todos os municípios
+        populacao = (
+            _data[_data["ano"] == ano]
+            .groupby(group_by)["populacao_total"]
+            .sum()
+            .reset_index()
+            .rename(columns={"populacao_total": f"populacao_{ano}"})
+        )
+    return populacao
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+def calcular_populacao_2024(_data, group_by, *, versao):
+    """Calcula população de 2024 agrupada por uma coluna."""
+    return calcular_populacao_por_ano(_data, group_by, 2024, versao=versao)
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+def calcular_indicadores_por_ano(_data, group_by, anos=ANOS, *, versao):
+    """Calcula óbitos, população e taxa por ano em formato longo (uma linha por grupo e ano)."""
+    obitos_por_ano = calcular_obitos_por_ano(_data, group_by, anos, versao=versao)
+    indicadores = []
+    for ano in anos:
+        indicadores_ano = (
+            obitos_por_ano[ano]
+            .merge(
+                calcular_populacao_por_ano(_data, group_by, ano, versao=versao),
+                on=group_by,
+                how="outer",
+            )
+            .merge(
+                calcular_taxa_por_ano(_data, group_by, ano, versao=versao),
+                on=group_by,
+                how="outer",
+            )
+            .rename(
+                columns={
+                    f"obitos_{ano}": "obitos",
+                    f"populacao_{ano}": "populacao",
+                    f"taxa_{ano}": "taxa",
+                }
+            )
+            .fillna(0)
+        )
+        indicadores_ano.insert(1, "ano", ano)
+        indicadores.append(indicadores_ano)
+    return pd.concat(indicadores, ignore_index=True)
+
+
+def _montar_arrays_estado(dados, versao, codigos=None):
+    """Arrays de população e óbitos por idade e sexo do estado de ``versao``.
+
+    ``codigos`` restringe a leitura a esses municípios. Retorna None se a
+    estrutura por idade e sexo do estado não foi gerada.
+    """
+    path_estrutura = caminho_artefato(
+        versao, DIR_ESTRUTURA, "estrutura_idade_sexo.parquet"
+    )
+    if not os.path.exists(path_estrutura):
+        return None
+    filtros = None if codigos is None else [("cod_ibge", "in", list(codigos))]
+    return montar_arrays(
+        pd.read_parquet(path_estrutura, filters=filtros),
+        dados[dados["ano"].isin(ANOS)][["cod_ibge", "ano", "quantidade_obitos"]],
+    )
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+def calcular_taxas_padronizadas_grupo(_data, group_by, *, versao):
+    """Calcula as taxas padronizadas por idade e sexo agrupadas por uma coluna.
+
+    Retorna None se a estrutura por idade e sexo do estado não foi gerada.
+    """
+    arrays = _montar_arrays_estado(_data, versao)
+    if arrays is None:
+        return None
+    if group_by == "cod_ibge":
+        taxas = calcular_taxas_padronizadas(arrays)
+    else:
+        # Grupo de cada município, alinhado aos eixos dos arrays
+        grupos = (
+            _data.drop_duplicates(subset="cod_ibge")
+            .set_index("cod_ibge")[group_by]
+            .reindex(arrays["codigos"])
+        )
+        taxas = calcular_taxas_padronizadas(
+            agrupar_arrays(arrays, grupos.to_numpy()), padrao=arrays
+        )
+    return taxas.rename(columns={"codigo": group_by})[[group_by] + COLUNAS_PADRONIZADAS]
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+def preparar_tabela_display(tabela, tipo="municipios", metrica="taxa_media"):
+    """Prepara tabela para exibição formatando colunas."""
+    tabela_display = tabela.copy()
+
+    if tipo == "municipios":
+        colunas_display = [
+            "cod_ibge",
+            "name_muni",
+            "Superintendência",
+            "obitos_total",
+            "populacao_2024",
+            "taxa_media",
+            "delta_obitos_pct",
+        ]
+        tabela_display = tabela_display[colunas_display]
+        # Formatação antes de renomear
+        tabela_display["cod_ibge"] = tabela_display["cod_ibge"].astype(str)
+        tabela_display["obitos_total"] = tabela_display["obitos_total"].astype(int)
+        tabela_display["populacao_2024"] = tabela_display["populacao_2024"].astype(int)
+        tabela_display["taxa_media"] = tabela_display["taxa_media"].round(2)
+        tabela_display["delta_obitos_pct"] = tabela_display["delta_obitos_pct"].round(2)
+        # Renomear colunas
+        tabela_display.columns = [
+            "Código IBGE",
+            "Município",
+            "Superintendência",
+            "Óbitos Total (2022-2024)",
+            "População 2024",
+            "Taxa Média de Óbitos",
+            "Variação óbitos (%)",
+        ]
+    else:  # superintendencias
+        colunas_display = [
+            "Superintendência",
+            "obitos_total",
+            "populacao_2024",
+            "taxa_media",
+            "delta_obitos_pct",
+        ]
+        tabela_display = tabela_display[colunas_display]
+        # Formatação antes de renomear
+        tabela_display["obitos_total"] = tabela_display["obitos_total"].astype(int)
+        tabela_display["populacao_2024"] = tabela_display["populacao_2024"].astype(int)
+        tabela_display["taxa_media"] = tabela_display["taxa_media"].round(2)
+        tabela_display["delta_obitos_pct"] = tabela_display["delta_obitos_pct"].round(2)
+        # Renomear colunas
+        tabela_display.columns = [
+            "Superintendência",
+            "Óbitos Total (2022-2024)",
+            "População 2024",
+            "Taxa Média de Óbitos",
+            "Variação óbitos (%)",
+        ]
+
+    # Métrica padronizada escolhida, com intervalo de confiança de 95%
+    if metrica != "taxa_media" and metrica in tabela.columns:
+        posicao = tabela_display.columns.get_loc("Taxa Média de Óbitos") + 1
+        colunas_metrica = [
+            (metrica, METRICAS[metrica][0]),
+            (f"{metrica}_ic_inf", "IC 95% inferior"),
+            (f"{metrica}_ic_sup", "IC 95% superior"),
+        ]
+        for deslocamento, (coluna, nome) in enumerate(colunas_metrica):
+            tabela_display.insert(
+                posicao + deslocamento, nome, tabela[coluna].round(2).to_numpy()
+            )
+
+    return tabela_display
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+def preparar_dados_mapa(_data, ano, group_by, dissolve=False, *, versao):
+    """Prepara dados GeoDataFrame para o mapa."""
+    dados = _data[(_data["ano"] == ano) & (_data[group_by].notna())].copy()
+
+    # Calcular taxa média
+    taxa_media = calcular_taxa_media(_data, group_by, versao=versao)
+
+    if dissolve:
+        # Dissolver polígonos
+        gdf = dados[[group_by, "geometry"]].dissolve(by=group_by).reset_index()
+    else:
+        # Manter polígonos individuais (um por grupo)
+        gdf = (
+            dados[[group_by, "geometry"]]
+            .drop_duplicates(subset=group_by)
+            .reset_index(drop=True)
+        )
+
+    # Merge com taxa média
+    gdf = gdf.merge(taxa_media, on=group_by, how="left")
+
+    return gdf
+
+
+# ============================================================================
+# PREPARAÇÃO DAS TABELAS
+# ============================================================================
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+def montar_tabela_municipios(_data, *, versao):
+    """Monta tabela numérica completa de municípios (sem formatação)."""
+    obitos_municipios = calcular_obitos_por_ano(_data, "cod_ibge", versao=versao)
+    taxa_media_municipios = calcular_taxa_media(_data, "cod_ibge", versao=versao)
+    populacao_2024_municipios = calcular_populacao_2024(
+        _data, "cod_ibge", versao=versao
+    )
+
+    todos_municipios = _data["cod_ibge"].unique()
+    tabela_base_municipios = pd.DataFrame({"cod_ibge": todos_municipios})
+
+    tabela_municipios = (
+        tabela_base_municipios.merge(obitos_municipios[2022], on="cod_ibge", how="left")
+        .merge(obitos_municipios[2023], on="cod_ibge", how="left")
+        .merge(obitos_municipios[2024], on="cod_ibge", how="left")
+        .merge(taxa_media_municipios, on="cod_ibge", how="left")
+        .merge(populacao_2024_municipios, on="cod_ibge", how="left")
+        .fillna(0)
+    )
+
+    # Calcular total de óbitos (soma dos três anos)
+    tabela_municipios["obitos_total"] = (
+        tabela_municipios["obitos_2022"]
+        + tabela_municipios["obitos_2023"]
+        + tabela_municipios["obitos_2024"]
+    )
+
+    # Calcular variação de óbitos (%)
+    tabela_municipios["delta_obitos_pct"] = (
+        (
+            (tabela_municipios["obitos_2024"] - tabela_municipios["obitos_2022"])
+            / tabela_municipios["obitos_2022"].replace(0, 1)
+        )
+        * 100
+    ).fillna(0)
+
+    info_municipios = _data[
+        ["cod_ibge", "name_muni", "Superintendência"]
+    ].drop_duplicates(subset="cod_ibge")
+
+    tabela_municipios = tabela_municipios.merge(
+        info_municipios, on="cod_ibge", how="left"
+    )
+
+    taxas_padronizadas = calcular_taxas_padronizadas_grupo(
+        _data, "cod_ibge", versao=versao
+    )
+    if taxas_padronizadas is not None:
+        tabela_municipios = tabela_municipios.merge(
+            taxas_padronizadas, on="cod_ibge", how="left"
+        )
+
+    return tabela_municipios
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+@persistir_em_disco(diretorio_cache)
+def preparar_tabela_municipios(_data, metrica="taxa_media", *, versao):
+    """Prepara tabela completa de municípios."""
+    tabela_municipios_display = preparar_tabela_display(
+        montar_tabela_municipios(_data, versao=versao),
+        tipo="municipios",
+        metrica=metrica,
+    )
+
+    return tabela_municipios_display
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+def montar_tabela_superintendencias(_data, *, versao):
+    """Monta tabela numérica completa de superintendências (sem formatação)."""
+    obitos_superintendencias = calcular_obitos_por_ano(
+        _data, "Superintendência", versao=versao
+    )
+    taxa_media_superintendencias = calcular_taxa_media(
+        _data, "Superintendência", versao=versao
+    )
+    populacao_2024_superintendencias = calcular_populacao_2024(
+        _data, "Superintendência", versao=versao
+    )
+
+    todos_superintendencias = _data["Superintendência"].dropna().unique()
+    tabela_base_superintendencias = pd.DataFrame(
+        {"Superintendência": todos_superintendencias}
+    )
+
+    tabela_superintendencias = (
+        tabela_base_superintendencias.merge(
+            obitos_superintendencias[2022], on="Superintendência", how="left"
+        )
+        .merge(obitos_superintendencias[2023], on="Superintendência", how="left")
+        .merge(obitos_superintendencias[2024], on="Superintendência", how="left")
+        .merge(taxa_media_superintendencias, on="Superintendência", how="left")
+        .merge(populacao_2024_superintendencias, on="Superintendência", how="left")
+        .fillna(0)
+    )
+
+    # Calcular total de óbitos (soma dos três anos)
+    tabela_superintendencias["obitos_total"] = (
+        tabela_superintendencias["obitos_2022"]
+        + tabela_superintendencias["obitos_2023"]
+        + tabela_superintendencias["obitos_2024"]
+    )
+
+    # Calcular variação de óbitos (%)
+    tabela_superintendencias["delta_obitos_pct"] = (
+        (
+            (
+                tabela_superintendencias["obitos_2024"]
+                - tabela_superintendencias["obitos_2022"]
+            )
+            / tabela_superintendencias["obitos_2022"].replace(0, 1)
+        )
+        * 100
+    ).fillna(0)
+
+    taxas_padronizadas = calcular_taxas_padronizadas_grupo(
+        _data, "Superintendência", versao=versao
+    )
+    if taxas_padronizadas is not None:
+        tabela_superintendencias = tabela_superintendencias.merge(
+            taxas_padronizadas, on="Superintendência", how="left"
+        )
+
+    return tabela_superintendencias
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+@persistir_em_disco(diretorio_cache)
+def preparar_tabela_superintendencias(_data, metrica="taxa_media", *, versao):
+    """Prepara tabela completa de superintendências."""
+    tabela_superintendencias_display = preparar_tabela_display(
+        montar_tabela_superintendencias(_data, versao=versao),
+        tipo="superintendencias",
+        metrica=metrica,
+    )
+
+    return tabela_superintendencias_display
+
+
+# ============================================================================
+# CONSULTA PAGINADA DAS TABELAS
+# ============================================================================
+#
+# Busca, filtro, ordenação e paginação são feitos no servidor e só a página
+# visível vai para o navegador. O texto de busca (sem acentos) e a ordem de
+# cada coluna são calculados uma única vez por tabela, no índice.
+
+
+def construir_indice_tabela(tabela, colunas_busca, colunas_filtro=()):
+    """Pré-calcula o texto normalizado de busca e a ordem de cada coluna."""
+    tabela = tabela.reset_index(drop=True)
+    normalizadas = {
+        coluna: normalize_series(tabela[coluna])
+        for coluna in tabela.columns
+        if not pd.api.types.is_numeric_dtype(tabela[coluna]) or coluna in colunas_busca
+    }
+    busca = normalizadas[colunas_busca[0]]
+    for coluna in colunas_busca[1:]:
+        busca = busca + " " + normalizadas[coluna]
+
+    # {coluna: (posições em ordem crescente, quantidade de valores não nulos)};
+    # textos são ordenados sem acentos e os nulos ficam sempre no fim
+    ordens = {}
+    for coluna in tabela.columns:
+        valores = tabela[coluna]
+        if not pd.api.types.is_numeric_dtype(valores):
+            valores = normalizadas[coluna].where(valores.notna())
+        ordem = valores.sort_values(kind="stable", na_position="last").index
+        ordens[coluna] = (ordem.to_numpy(), int(valores.notna().sum()))
+
+    return {
+        "tabela": tabela,
+        "busca": busca,
+        "ordens": ordens,
+        "opcoes": {
+            coluna: sorted(tabela[coluna].dropna().unique(), key=_normalize_value)
+            for coluna in colunas_filtro
+            if tabela[coluna].notna().any()
+        },
+    }
+
+
+def filtrar_tabela(indice, busca="", filtros=None, ordenar_por=None, decrescente=False):
+    """Posições (já ordenadas) das linhas que atendem à busca e aos filtros.
+
+    A busca ignora acentos e maiúsculas; cada palavra precisa aparecer em
+    alguma das colunas de busca. ``filtros`` é ``{coluna: valores aceitos}``.
+    """
+    tabela = indice["tabela"]
+    selecionadas = np.ones(len(tabela), dtype=bool)
+    for termo in _normalize_value(busca).split():
+        selecionadas &= indice["busca"].str.contains(termo, regex=False).to_numpy()
+    for coluna, valores in (filtros or {}).items():
+        if valores:
+            selecionadas &= tabela[coluna].isin(valores).to_numpy()
+
+    if ordenar_por is None:
+        return np.flatnonzero(selecionadas)
+    ordem, nao_nulos = indice["ordens"][ordenar_por]
+    if decrescente:
+        ordem = np.concatenate([ordem[:nao_nulos][::-1], ordem[nao_nulos:]])
+    return ordem[selecionadas[ordem]]
+
+
+def paginar_tabela(indice, posicoes, pagina=1, linhas_por_pagina=25):
+    """Linhas de uma página (começando em 1) do resultado de ``filtrar_tabela``."""
+    inicio = (pagina - 1) * linhas_por_pagina
+    return indice["tabela"].iloc[posicoes[inicio : inicio + linhas_por_pagina]]
+
+
+# ============================================================================
+# PREPARAÇÃO DOS DADOS DOS MAPAS
+# ============================================================================
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+@persistir_em_disco(diretorio_cache)
+def preparar_dados_mapa_municipios(_data, *, versao):
+    """Prepara dados completos do mapa de municípios."""
+    dados_municipios = preparar_dados_mapa(
+        _data, 2024, "cod_ibge", dissolve=False, versao=versao
+    )
+    info_municipios = _data[
+        ["cod_ibge", "name_muni", "Superintendência"]
+    ].drop_duplicates(subset="cod_ibge")
+    dados_municipios = dados_municipios.merge(
+        info_municipios[["cod_ibge", "name_muni", "Superintendência"]],
+        on="cod_ibge",
+        how="left",
+    )
+    taxas_padronizadas = calcular_taxas_padronizadas_grupo(
+        _data, "cod_ibge", versao=versao
+    )
+    if taxas_padronizadas is not None:
+        dados_municipios = dados_municipios.merge(
+            taxas_padronizadas, on="cod_ibge", how="left"
+        )
+    return dados_municipios
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+@persistir_em_disco(diretorio_cache)
+def preparar_dados_mapa_superintendencias(_data, assinatura_geo, *, versao):
+    """Prepara dados completos do mapa de superintendências usando shapes oficiais.
+
+    ``assinatura_geo`` vem de ``assinatura_superintendencias_geo``.
+    """
+    geo_superintendencias = carregar_superintendencias_geo(assinatura_geo)
+    taxa_media = calcular_taxa_media(_data, "Superintendência", versao=versao).copy()
+    taxas_padronizadas = calcular_taxas_padronizadas_grupo(
+        _data, "Superintendência", versao=versao
+    )
+    colunas_metricas = ["taxa_media"]
+    if taxas_padronizadas is not None:
+        taxa_media = taxa_media.merge(
+            taxas_padronizadas, on="Superintendência", how="left"
+        )
+        colunas_metricas += COLUNAS_PADRONIZADAS
+    taxa_media["superintendencia_norm"] = normalize_series(
+        taxa_media["Superintendência"]
+    )
+
+    geo = geo_superintendencias.copy()
+    if "superintendencia_norm" not in geo.columns:
+        geo["superintendencia_norm"] = normalize_series(geo["superinten"])
+
+    # Mapeamento manual para corrigir diferenças de grafia e casos especiais
+    # Formato: {nome_normalizado_no_geo: nome_normalizado_no_sysdata}
+    mapeamento_manual = {
+        "sao bernardo do campo": "sao bernado do campo",  # Corrige grafia "BERNADO" vs "BERNARDO"
+        "botucatu": "piracicaba",  # Botucatu no geo corresponde a PIRACICABA no sysdata
+    }
+
+    # Mapeamento de nomes para exibição (quando o nome no geo difere do nome no sysdata)
+    mapeamento_nomes = {
+        "botucatu": "PIRACICABA",  # Exibir como PIRACICABA mesmo que o shape seja Botucatu
+    }
+
+    # Aplicar mapeamento manual no geo
+    geo["superintendencia_norm_mapped"] = geo["superintendencia_norm"].map(
+        lambda x: mapeamento_manual.get(x, x)
+    )
+
+    # Fazer merge usando o nome mapeado
+    gdf = geo.merge(
+        taxa_media[["superintendencia_norm", "Superintendência"] + colunas_metricas],
+        left_on="superintendencia_norm_mapped",
+        right_on="superintendencia_norm",
+        how="left",
+    )
+
+    # Preencher Superintendência: usar nome do sysdata quando disponível,
+    # caso contrário usar mapeamento de nomes, senão usar nome original do geo
+    # Criar série auxiliar para mapeamento
+    for idx in gdf.index:
+        if pd.isna(gdf.loc[idx, "Superintendência"]):
+            geo_norm_val = geo.loc[idx, "superintendencia_norm"]
+            if geo_norm_val in mapeamento_nomes:
+                gdf.loc[idx, "Superintendência"] = mapeamento_nomes[geo_norm_val]
+            else:
+                gdf.loc[idx, "Superintendência"] = geo.loc[idx, "superinten"]
+    gdf[colunas_metricas] = gdf[colunas_metricas].fillna(0)
+
+    # Remover colunas auxiliares apenas se existirem
+    colunas_para_remover = []
+    if "superintendencia_norm" in gdf.columns:
+        colunas_para_remover.append("superintendencia_norm")
+    if "superintendencia_norm_mapped" in gdf.columns:
+        colunas_para_remover.append("superintendencia_norm_mapped")
+    if colunas_para_remover:
+        gdf = gdf.drop(columns=colunas_para_remover)
+
+    return gdf
+
+
+# ============================================================================
+# AGRUPAMENTOS ESPACIAIS
+# ============================================================================
+
+
+def _metrica_municipios_divisa(_data, vizinhanca, codigos, metrica, versao):
+    """Métrica dos municípios de outros estados vizinhos aos ``codigos``.
+
+    Lê das partições desses estados (mesma publicação) só os municípios de
+    divisa, sem passar pelos caches em memória. As taxas padronizadas usam o
+    padrão do estado de ``versao``, como as do próprio estado. Estados fora da
+    publicação ficam de fora.
+    """
+    externos = pd.Series(np.setdiff1d(vizinhanca["destino"].unique(), codigos))
+    id_versao = versao.split("@", 1)[1]
+    padrao = None
+    partes = []
+    for code_state, codigos_estado in externos.groupby(externos // 100000):
+        versao_estado = f"{code_state}@{id_versao}"
+        path_particao = caminho_particao(versao_estado)
+        if not os.path.exists(path_particao):
+            continue
+        dados = pd.read_parquet(
+            path_particao,
+            columns=["cod_ibge", "ano", "quantidade_obitos", "populacao_total"],
+            filters=[("cod_ibge", "in", codigos_estado.tolist())],
+        )
+        if metrica == "taxa_media":
+            dados = dados[dados["ano"].isin(ANOS)]
+            valores = (
+                dados.assign(taxa_obitos=calcular_taxa_obitos(dados))
+                .groupby("cod_ibge")["taxa_obitos"]
+                .mean()
+            )
+        else:
+            arrays = _montar_arrays_estado(dados, versao_estado, codigos_estado)
+            if padrao is None:
+                padrao = _montar_arrays_estado(_data, versao)
+            if arrays is None or padrao is None:
+                continue
+            valores = calcular_taxas_padronizadas(arrays, padrao=padrao).set_index(
+                "codigo"
+            )[metrica]
+        partes.append(valores.dropna())
+    if not partes:
+        return pd.Series(dtype=float)
+    return pd.concat(partes)
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+@persistir_em_disco(diretorio_cache)
+def calcular_agrupamentos_municipios(_data, metrica="taxa_media", *, versao):
+    """Calcula Moran local e Gi* da métrica por município.
+
+    Usa a vizinhança gerada pelo sysdata.py (calculada no país inteiro); retorna
+    None se ela não existe. Os municípios de divisa dos estados vizinhos entram
+    no cálculo para que a vizinhança dos municípios da borda fique completa e
+    são descartados no resultado. ``vizinhos_ausentes`` conta os vizinhos sem
+    dados (estado fora da publicação).
+    """
+    path_vizinhanca = caminho_artefato(versao, DIR_VIZINHANCA, "vizinhanca.parquet")
+    if not os.path.exists(path_vizinhanca):
+        return None
+
+    vizinhanca = pd.read_parquet(path_vizinhanca)
+    tabela = montar_tabela_municipios(_data, versao=versao)
+    tabela = tabela[tabela[metrica].notna()]
+    divisa = _metrica_municipios_divisa(
+        _data, vizinhanca, tabela["cod_ibge"].to_numpy(), metrica, versao
+    )
+    codigos = np.concatenate([tabela["cod_ibge"].to_numpy(), divisa.index])
+    valores = np.concatenate([tabela[metrica].to_numpy(), divisa.to_numpy()])
+
+    inicio, vizinhos = matriz_vizinhanca(vizinhanca, codigos)
+    agrupamentos = calcular_agrupamentos(valores, inicio, vizinhos).iloc[: len(tabela)]
+    agrupamentos.insert(0, "cod_ibge", tabela["cod_ibge"].to_numpy())
+    ausentes = vizinhanca.loc[~vizinhanca["destino"].isin(codigos), "origem"]
+    agrupamentos["vizinhos_ausentes"] = (
+        agrupamentos["cod_ibge"].map(ausentes.value_counts()).fillna(0).astype(int)
+    )
+    return agrupamentos
+
+
+# ============================================================================
+# DETALHE DOS ÓBITOS POR MUNICÍPIO
+# ============================================================================
+
+
+@st.cache_resource(max_entries=MAX_ESTADOS_EM_MEMORIA)
+def carregar_detalhe_obitos(code_state, *, versao):
+    """Abre o detalhe dos óbitos via memory map (None se não foi gerado)."""
+    path_detalhe = caminho_artefato(versao, DIR_DETALHE, "detalhe_obitos.arrow")
+    path_detalhe_indice = caminho_artefato(
+        versao, DIR_DETALHE, "detalhe_obitos_indice.arrow"
+    )
+    if not (os.path.exists(path_detalhe) and os.path.exists(path_detalhe_indice)):
+        return None
+    tabela = pa.ipc.open_file(pa.memory_map(path_detalhe)).read_all()
+    indice = pd.read_feather(path_detalhe_indice)
+    # {(cod_ibge, ano): (inicio, fim)} sobre as linhas de tabela
+    faixas = {
+        (int(cod_ibge), int(ano)): (int(inicio), int(fim))
+        for cod_ibge, ano, inicio, fim in indice[
+            ["cod_ibge", "ano_obito", "inicio", "fim"]
+        ].itertuples(index=False)
+    }
+    return {"tabela": tabela, "faixas": faixas}
+
+
+def consultar_detalhe_municipio(detalhe, cod_ibge, anos=ANOS):
+    """Retorna os registros de óbito de um município lendo só as faixas do índice."""
+    tabela = detalhe["tabela"]
+    partes = []
+    for ano in anos:
+        faixa = detalhe["faixas"].get((int(cod_ibge), ano))
+        if faixa is not None:
+            inicio, fim = faixa
+            partes.append(tabela.slice(inicio, fim - inicio))
+    if not partes:
+        return tabela.slice(0, 0).to_pandas()
+    return pa.concat_tables(partes).to_pandas()
+
+
+def resumir_detalhe_obitos(registros):
+    """Calcula as distribuições dos óbitos por sexo, faixa etária, tipo de vítima e mês."""
+    distribuicoes = {}
+    if "sexo" in registros.columns:
+        distribuicoes["Sexo"] = registros["sexo"].value_counts(sort=False)
+    if "idade" in registros.columns:
+        faixa_etaria = classificar_faixa_etaria(registros["idade"])
+        distribuicoes["Faixa etária"] = faixa_etaria.value_counts(sort=False)
+    if "tipo_de_vitima" in registros.columns:
+        distribuicoes["Tipo de vítima"] = registros["tipo_de_vitima"].value_counts(
+            sort=False
+        )
+    if "mes_obito" in registros.columns:
+        distribuicoes["Mês do óbito"] = (
+            registros["mes_obito"].value_counts().sort_index()
+        )
+    return distribuicoes
+
+
+# ============================================================================
+# PAINEL COMPLETO DE UM ESTADO
+# ============================================================================
+
+
+@st.cache_resource(max_entries=MAX_ENTRADAS_CACHE)
+def carregar_indice_espacial(_gdf, nome, versao, assinatura_geo=None):
+    """Constrói uma única vez o índice espacial, compartilhado entre sessões.
+
+    ``assinatura_geo`` identifica os shapes de origem, se não vierem da partição.
+    """
+    return construir_indice_espacial(_gdf)
+
+
+@st.cache_resource(max_entries=MAX_ENTRADAS_CACHE)
+def carregar_indice_tabela(_tabela, nome, metrica, versao):
+    """Constrói uma única vez o índice de consulta da tabela, compartilhado entre sessões."""
+    return construir_indice_tabela(
+        _tabela, COLUNAS_BUSCA[nome], colunas_filtro=COLUNAS_FILTRO[nome]
+    )
+
+
+def listar_metricas(versao):
+    """Métricas disponíveis; as padronizadas só existem se a estrutura foi gerada."""
+    path_estrutura = caminho_artefato(
+        versao, DIR_ESTRUTURA, "estrutura_idade_sexo.parquet"
+    )
+    if not os.path.exists(path_estrutura):
+        return ["taxa_media"]
+    return list(METRICAS)
+
+
+@st.cache_data(max_entries=MAX_ENTRADAS_CACHE)
+@persistir_em_disco(diretorio_cache)
+def preparar_camadas_mapas(_painel, metrica, assinatura_geo, *, versao):
+    """Camadas (GeoJSON colorido e limites) dos mapas da métrica, prontas para o folium.
+
+    ``assinatura_geo`` é a de ``_painel`` (None sem superintendências).
+    """
+    # Importação pesada (folium/branca) só quando a camada não está em cache
+    from mapas import preparar_camada, preparar_camada_agrupamentos
+
+    camadas = {
+        "municipios": preparar_camada(_painel["dados_municipios"].copy(), metrica)
+    }
+    if _painel["agrupamentos"] is not None:
+        camadas["agrupamentos"] = preparar_camada_agrupamentos(
+            _painel["dados_municipios"][["cod_ibge", "name_muni", "geometry"]].merge(
+                _painel["agrupamentos"], on="cod_ibge"
+            ),
+            tooltip_field="name_muni",
+        )
+    if _painel["tem_superintendencias"]:
+        camadas["superintendencias"] = preparar_camada(
+            _painel["dados_superintendencias"].copy(), metrica
+        )
+    return camadas
+
+
+def preparar_painel(code_state, metrica, versao):
+    """Reúne (dos caches ou calculando) tudo o que o painel exibe para um estado.
+
+    O app e o pré-aquecimento chamam esta mesma função, então as chaves de
+    cache coincidem e uma versão pré-aquecida não é recalculada nas sessões.
+    """
+    sysdata = carregar_dados(code_state, versao=versao)
+    painel = {
+        "sysdata": sysdata,
+        # Superintendências (DETRAN-SP) só existem para estados com mapeamento CETRAN
+        "tem_superintendencias": bool(sysdata["Superintendência"].notna().any()),
+        "tabela_municipios": preparar_tabela_municipios(
+            sysdata, metrica=metrica, versao=versao
+        ),
+        "dados_municipios": preparar_dados_mapa_municipios(sysdata, versao=versao),
+        "agrupamentos": calcular_agrupamentos_municipios(
+            sysdata, metrica, versao=versao
+        ),
+        "detalhe_obitos": carregar_detalhe_obitos(code_state, versao=versao),
+        "assinatura_geo": None,
+    }
+    painel["indices_espaciais"] = {
+        "municipios": carregar_indice_espacial(
+            painel["dados_municipios"], "municipios", versao
+        )
+    }
+    painel["indices_tabelas"] = {
+        "municipios": carregar_indice_tabela(
+            painel["tabela_municipios"], "municipios", metrica, versao
+        )
+    }
+    if painel["tem_superintendencias"]:
+        # Shapes fora da publicação: a assinatura entra nas chaves do que deriva deles
+        painel["assinatura_geo"] = assinatura_superintendencias_geo()
+        painel["tabela_superintendencias"] = preparar_tabela_superintendencias(
+            sysdata, metrica=metrica, versao=versao
+        )
+        painel["dados_superintendencias"] = preparar_dados_mapa_superintendencias(
+            sysdata, painel["assinatura_geo"], versao=versao
+        )
+        painel["indices_espaciais"]["superintendencias"] = carregar_indice_espacial(
+            painel["dados_superintendencias"],
+            "superintendencias",
+            versao,
+            painel["assinatura_geo"],
+        )
+        painel["indices_tabelas"]["superintendencias"] = carregar_indice_tabela(
+            painel["tabela_superintendencias"], "superintendencias", metrica, versao
+        )
+    painel["camadas"] = preparar_camadas_mapas(
+        painel, metrica, painel["assinatura_geo"], versao=versao
+    )
+    return painel
+
+
+def preaquecer(manifesto, estados=None):
+    """Preenche os caches (memória e disco) dos estados e métricas de uma publicação.
+
+    Sem ``estados``, aquece todos os estados publicados.
+    """
+    for code_state in estados or listar_estados(manifesto):
+        versao = versao_dados(code_state, manifesto)
+        for metrica in listar_metricas(versao):
+            preparar_painel(code_state, metrica, versao)
@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+import shapely
+
+# ============================================================================
+# VIZINHANÇA E AUTOCORRELAÇÃO ESPACIAL LOCAL
+# ============================================================================
+#
+# A vizinhança (contiguidade do tipo rainha: polígonos que se tocam em ao menos
+# um ponto) é obtida com uma única consulta em lote ao índice espacial e
+# guardada como lista de arestas. As estatísticas locais (Moran local e Gi*)
+# usam inferência por permutação condicional vetorizada: os mesmos sorteios de
+# vizinhos servem para todos os municípios, processados em lotes de linhas.
+
+CLASSES_AGRUPAMENTO = {
+    "Alto-Alto": "#d7191c",
+    "Baixo-Baixo": "#2c7bb6",
+    "Alto-Baixo": "#fdae61",
+    "Baixo-Alto": "#abd9e9",
+    "Não significativo": "#f0f0f0",
+    "Sem vizinhos": "#bdbdbd",
+}
+
+# Tolerância padrão (em graus) da simplificação das geometrias exibidas nos
+# mapas: municípios no sysdata.py, superintendências ao carregar o shape
+TOLERANCIA_SIMPLIFICACAO = 0.001
+
+
+def construir_vizinhanca(gdf, coluna="code_muni"):
+    """Lista de arestas (origem, destino) entre polígonos que se tocam.
+
+    Usa o índice espacial do GeoDataFrame em vez de comparar todos os pares.
+    """
+    gdf = gdf[gdf.geometry.notna() & ~gdf.geometry.is_empty].reset_index(drop=True)
+    origem, destino = gdf.sindex.query(gdf.geometry, predicate="intersects")
+    distintos = origem != destino
+    codigos = gdf[coluna].astype("int64").to_numpy()
+    return pd.DataFrame(
+        {
+            "origem": codigos[origem[distintos]],
+            "destino": codigos[destino[distintos]],
+        }
+    ).drop_duplicates(ignore_index=True)
+
+
+def matriz_vizinhanca(vizinhanca, codigos):
+    """Converte a lista de arestas para formato CSR alinhado a ``codigos``.
+
+    Retorna ``(inicio, vizinhos)``: os vizinhos da posição ``i`` são
+    ``vizinhos[inicio[i]:inicio[i + 1]]``. Arestas para códigos fora de
+    ``codigos`` são descartadas.
+    """
+    posicoes = pd.Index(codigos)
+    origem = posicoes.get_indexer(vizinhanca["origem"])
+    destino = posicoes.get_indexer(vizinhanca["destino"])
+    validos = (origem >= 0) & (destino >= 0)
+    origem, destino = origem[validos], destino[validos]
+    ordem = np.argsort(origem, kind="stable")
+    inicio = np.zeros(len(codigos) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(origem, minlength=len(codigos)), out=inicio[1:])
+    return inicio, destino[ordem]
+
+
+def _pseudo_p(maiores, permutacoes):
+    """Pseudo p-valor de permutação, unicaudal na direção observada."""
+    maiores = np.minimum(maiores, permutacoes - maiores)
+    return (maiores + 1) / (permutacoes + 1)
+
+
+def calcular_agrupamentos(
+    valores,
+    inicio,
+    vizinhos,
+    permutacoes=999,
+    alfa=0.05,
+    semente=12345,
+    elementos_por_lote=4_000_000,
+):
+    """Calcula Moran local e Gi* com pseudo p-valores por permutação condicional.
+
+    ``valores`` é alinhado às posições da matriz CSR ``(inicio, vizinhos)``;
+    os pesos são binários (padronizados por linha no Moran local).
+    """
+    x = np.asarray(valores, dtype=float)
+    n = len(x)
+    cardinalidade = np.diff(inicio)
+    z = x - x.mean()
+    m2 = (z**2).sum() / n
+
+    # Defasagem espacial observada: soma dos valores dos vizinhos
+    soma_vizinhos = np.bincount(
+        np.repeat(np.arange(n), cardinalidade), weights=z[vizinhos], minlength=n
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        defasagem = soma_vizinhos / cardinalidade
+        moran_local = z * defasagem / m2
+
+        # Gi*: vizinhos mais o próprio município, pesos binários
+        # (numerador = soma dos desvios em relação à média)
+        pesos = cardinalidade + 1
+        gi_estrela = (soma_vizinhos + z) / (
+            x.std() * np.sqrt((n * pesos - pesos**2) / (n - 1))
+        )
+
+    # Sorteios compartilhados: cada linha é uma amostra sem reposição de
+    # posições em [0, n - 1), deslocadas para pular o próprio município
+    rng = np.random.default_rng(semente)
+    kmax = int(cardinalidade.max()) if n else 0
+    p_moran = np.full(n, np.nan)
+    p_gi = np.full(n, np.nan)
+    if kmax > 0 and n > kmax + 1:
+        sorteios = np.argpartition(rng.random((permutacoes, n - 1)), kmax, axis=1)[
+            :, :kmax
+        ]
+        sorteios = rng.permuted(sorteios, axis=1)
+
+        com_vizinhos = np.flatnonzero(cardinalidade > 0)
+        tamanho_lote = max(1, elementos_por_lote // (permutacoes * kmax))
+        for inicio_lote in range(0, len(com_vizinhos), tamanho_lote):
+            linhas = com_vizinhos[inicio_lote : inicio_lote + tamanho_lote]
+            posicoes = sorteios[None, :, :] + (
+                sorteios[None, :, :] >= linhas[:, None, None]
+            )
+            acumulado = np.cumsum(z[posicoes], axis=2)
+            soma_permutada = acumulado[
+                np.arange(len(linhas)), :, cardinalidade[linhas] - 1
+            ]
+            # Moran local: mesmo sinal de z_i que o observado
+            maiores_moran = (
+                z[linhas, None] * soma_permutada
+                >= (z[linhas] * soma_vizinhos[linhas])[:, None]
+            ).sum(axis=1)
+            maiores_gi = (soma_permutada >= soma_vizinhos[linhas, None]).sum(axis=1)
+            p_moran[linhas] = _pseudo_p(maiores_moran, permutacoes)
+            p_gi[linhas] = _pseudo_p(maiores_gi, permutacoes)
+
+    quadrante = np.select(
+        [
+            (z > 0) & (defasagem > 0),
+            (z < 0) & (defasagem < 0),
+            (z > 0) & (defasagem < 0),
+            (z < 0) & (defasagem > 0),
+        ],
+        ["Alto-Alto", "Baixo-Baixo", "Alto-Baixo", "Baixo-Alto"],
+        default="Não significativo",
+    )
+    agrupamento = np.where(p_moran <= alfa, quadrante, "Não significativo")
+    agrupamento = np.where(cardinalidade == 0, "Sem vizinhos", agrupamento)
+    ponto = np.select(
+        [(p_gi <= alfa) & (gi_estrela > 0), (p_gi <= alfa) & (gi_estrela < 0)],
+        ["Ponto quente", "Ponto frio"],
+        default="Não significativo",
+    )
+
+    return pd.DataFrame(
+        {
+            "vizinhos": cardinalidade,
+            "moran_local": moran_local,
+            "moran_local_p": p_moran,
+            "gi_estrela": gi_estrela,
+            "gi_estrela_p": p_gi,
+            "agrupamento": agrupamento,
+            "ponto_quente_frio": ponto,
+        }
+    )
+
+
+# ============================================================================
+# ÍNDICE ESPACIAL (CLIQUE NO MAPA)
+# ============================================================================
+
+
+def construir_indice_espacial(gdf):
+    """Constrói STRtree sobre as geometrias do GeoDataFrame (posição = linha)."""
+    indice = shapely.STRtree(gdf.geometry.values)
+    # Geometrias preparadas tornam o teste ponto-no-polígono muito mais rápido
+    shapely.prepare(indice.geometries)
+    return indice
+
+
+def localizar_entidade(indice, lat, lng):
+    """Retorna a posição da geometria que contém o ponto clicado, ou None."""
+    candidatos = indice.query(shapely.Point(lng, lat))
+    candidatos = candidatos[
+        shapely.contains_xy(indice.geometries[candidatos], lng, lat)
+    ]
+    if len(candidatos) == 0:
+        return None
+    return int(candidatos.min())
@@ -0,0 +1,47 @@
+import argparse
+
+# Códigos IBGE das unidades da federação
+SIGLAS_UF = {
+    11: "RO",
+    12: "AC",
+    13: "AM",
+    14: "RR",
+    15: "PA",
+    16: "AP",
+    17: "TO",
+    21: "MA",
+    22: "PI",
+    23: "CE",
+    24: "RN",
+    25: "PB",
+    26: "PE",
+    27: "AL",
+    28: "SE",
+    29: "BA",
+    31: "MG",
+    32: "ES",
+    33: "RJ",
+    35: "SP",
+    41: "PR",
+    42: "SC",
+    43: "RS",
+    50: "MS",
+    51: "MT",
+    52: "GO",
+    53: "DF",
+}
+
+
+def codigo_estado(valor):
+    """Aceita código IBGE ("35") ou sigla ("SP") e retorna o código.
+
+    Usado como ``type`` dos argumentos de estado nas linhas de comando.
+    """
+    if valor.isdigit():
+        code_state = int(valor)
+    else:
+        siglas = {sigla: code for code, sigla in SIGLAS_UF.items()}
+        code_state = siglas.get(valor.upper())
+    if code_state not in SIGLAS_UF:
+        raise argparse.ArgumentTypeError(f"Estado inválido: {valor}")
+    return code_state
@@ -0,0 +1,45 @@
+import pandas as pd
+
+# Faixas etárias alinhadas a múltiplos de 5 para aceitar tanto idades simples
+# quanto faixas quinquenais (ex.: "20 a 24", "80 e mais")
+FAIXAS_ETARIAS = [0, 15, 20, 25, 30, 40, 50, 60, 200]
+ROTULOS_FAIXAS_ETARIAS = [
+    "0-14",
+    "15-19",
+    "20-24",
+    "25-29",
+    "30-39",
+    "40-49",
+    "50-59",
+    "60+",
+]
+
+SEXOS = ["F", "M"]
+
+
+def classificar_faixa_etaria(idades: pd.Series) -> pd.Series:
+    """Classifica idades (números ou textos como "20 a 24") nas faixas etárias."""
+    inicio = pd.to_numeric(
+        idades.fillna("").astype(str).str.extract(r"(\d+)", expand=False),
+        errors="coerce",
+    )
+    return pd.cut(
+        inicio,
+        bins=FAIXAS_ETARIAS,
+        labels=ROTULOS_FAIXAS_ETARIAS,
+        right=False,
+    )
+
+
+def _codigo_sexo(valor):
+    if valor in ("M", "1") or valor.startswith(("MASC", "HOM")):
+        return "M"
+    if valor in ("F", "2") or valor.startswith(("FEM", "MUL")):
+        return "F"
+    return None
+
+
+def normalizar_sexo(sexos: pd.Series) -> pd.Series:
+    """Converte as codificações de sexo das fontes para "F"/"M" (ou NaN)."""
+    codigos = sexos.fillna("").astype(str).str.strip().str.upper().map(_codigo_sexo)
+    return codigos.astype(pd.CategoricalDtype(SEXOS))
@@ -0,0 +1,198 @@
+import argparse
+import html
+import os
+from rich.console import Console
+
+from dados import (
+    TEXTO_SOBRE,
+    TITULO_PAGINA,
+    assinatura_superintendencias_geo,
+    carregar_dados,
+    escolher_estado,
+    ler_manifesto,
+    preparar_dados_mapa_municipios,
+    preparar_dados_mapa_superintendencias,
+    preparar_tabela_municipios,
+    preparar_tabela_superintendencias,
+    versao_dados,
+)
+from estados import SIGLAS_UF, codigo_estado
+from mapas import (
+    criar_mapa_municipios,
+    criar_mapa_superintendencias,
+    preparar_camada,
+)
+
+console = Console()
+
+# Ordenação das tabelas no navegador, sem dependências externas
+SCRIPT_ORDENACAO = """
+<script>
+document.querySelectorAll("table.tabela-ordenavel").forEach(function (tabela) {
+  tabela.querySelectorAll("th").forEach(function (th, coluna) {
+    var crescente = true;
+    th.addEventListener("click", function () {
+      var corpo = tabela.tBodies[0];
+      var linhas = Array.from(corpo.rows);
+      linhas.sort(function (a, b) {
+        var x = a.cells[coluna].textContent, y = b.cells[coluna].textContent;
+        var nx = parseFloat(x), ny = parseFloat(y);
+        var cmp = (!isNaN(nx) && !isNaN(ny)) ? nx - ny : x.localeCompare(y, "pt-BR");
+        return crescente ? cmp : -cmp;
+      });
+      crescente = !crescente;
+      linhas.forEach(function (linha) { corpo.appendChild(linha); });
+    });
+  });
+});
+</script>
+"""
+
+ESTILO = """
+<style>
+body { font-family: 'Open Sans', sans-serif; color: #3A3F51; margin: 2rem; }
+h1, h2 { color: #111414; }
+table.tabela-ordenavel { border-collapse: collapse; width: 100%; }
+table.tabela-ordenavel th { background-color: #F5F5F5; color: #111414; cursor: pointer;
+  border-bottom: 2px solid #D3D8DB; text-align: left; padding: 4px 8px; }
+table.tabela-ordenavel td { border-bottom: 1px solid #D3D8DB; padding: 4px 8px; }
+.rolagem { max-height: 400px; overflow-y: auto; border: 1px solid #D3D8DB; border-radius: 4px; }
+iframe { width: 100%; height: 600px; border: none; }
+</style>
+"""
+
+
+def _sobre_html():
+    """Converte a lista em Markdown do texto "Sobre" em HTML."""
+    itens = []
+    rodape = []
+    for linha in TEXTO_SOBRE.strip().splitlines():
+        linha = linha.strip()
+        if linha.startswith("- "):
+            itens.append(f"<li>{html.escape(linha[2:])}</li>")
+        elif linha:
+            rodape.append(f"<p>{html.escape(linha)}</p>")
+    return "<ul>" + "".join(itens) + "</ul>" + "".join(rodape)
+
+
+def _tabela_html(tabela, table_id):
+    """Gera tabela HTML ordenável a partir da tabela de exibição."""
+    return tabela.to_html(
+        index=False,
+        table_id=table_id,
+        classes="tabela-ordenavel",
+        border=0,
+    )
+
+
+def _gravar_geojson(camada, dir_saida, nome_arquivo):
+    """Grava a geometria da camada ao lado dos mapas e retorna o endereço relativo."""
+    with open(os.path.join(dir_saida, nome_arquivo), "w", encoding="utf-8") as f:
+        f.write(camada["geojson"])
+    return nome_arquivo
+
+
+def exportar(dir_saida, code_state, versao):
+    """Renderiza o painel de um estado em um pacote estático em ``dir_saida``."""
+    os.makedirs(dir_saida, exist_ok=True)
+
+    console.print(f"Carregando dados {versao}")
+    sysdata = carregar_dados(code_state, versao=versao)
+    # Superintendências (DETRAN-SP) só existem para estados com mapeamento CETRAN
+    tem_superintendencias = bool(sysdata["Superintendência"].notna().any())
+
+    console.print("Preparando tabelas")
+    tabela_municipios_display = preparar_tabela_municipios(sysdata, versao=versao)
+    tabelas = [("tabela_municipios", tabela_municipios_display)]
+    if tem_superintendencias:
+        tabela_superintendencias_display = preparar_tabela_superintendencias(
+            sysdata, versao=versao
+        )
+        tabelas.append(("tabela_superintendencias", tabela_superintendencias_display))
+
+    for nome, tabela in tabelas:
+        tabela.to_json(
+            os.path.join(dir_saida, f"{nome}.json"),
+            orient="split",
+            index=False,
+            force_ascii=False,
+        )
+
+    console.print("Preparando mapas")
+    dados_municipios = preparar_dados_mapa_municipios(sysdata, versao=versao)
+    camada_municipios = preparar_camada(dados_municipios)
+    m_municipios = criar_mapa_municipios(
+        dados_municipios,
+        url_geojson=_gravar_geojson(camada_municipios, dir_saida, "municipios.geojson"),
+        camada=camada_municipios,
+    )
+    m_municipios.save(os.path.join(dir_saida, "mapa_municipios.html"))
+
+    secoes_superintendencias = ""
+    if tem_superintendencias:
+        dados_superintendencias = preparar_dados_mapa_superintendencias(
+            sysdata, assinatura_superintendencias_geo(), versao=versao
+        )
+        camada_superintendencias = preparar_camada(dados_superintendencias)
+        m_superintendencias = criar_mapa_superintendencias(
+            dados_superintendencias,
+            url_geojson=_gravar_geojson(
+                camada_superintendencias, dir_saida, "superintendencias.geojson"
+            ),
+            camada=camada_superintendencias,
+        )
+        m_superintendencias.save(os.path.join(dir_saida, "mapa_superintendencias.html"))
+        secoes_superintendencias = f"""<h2>Tabela de Superintendências</h2>
+<div class="rolagem">{_tabela_html(tabela_superintendencias_display, "tabela-superintendencias")}</div>
+<h2>Mapa de Superintendências</h2>
+<iframe src="mapa_superintendencias.html" loading="lazy"></iframe>
+"""
+
+    console.print("Gerando página")
+    pagina = f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(TITULO_PAGINA)}</title>
+{ESTILO}
+</head>
+<body>
+<h1>{html.escape(TITULO_PAGINA)}</h1>
+<h2>Sobre</h2>
+{_sobre_html()}
+<h2>Tabela de Municípios</h2>
+<div class="rolagem">{_tabela_html(tabela_municipios_display, "tabela-municipios")}</div>
+<h2>Mapa de Municípios</h2>
+<iframe src="mapa_municipios.html" loading="lazy"></iframe>
+{secoes_superintendencias}{SCRIPT_ORDENACAO}
+</body>
+</html>
+"""
+    with open(os.path.join(dir_saida, "index.html"), "w", encoding="utf-8") as f:
+        f.write(pagina)
+
+    console.print(f"Painel estático salvo em {dir_saida}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Exporta o painel como pacote estático (HTML, JSON e GeoJSON)."
+    )
+    parser.add_argument(
+        "--saida", default="dist", help="Diretório de saída (padrão: dist)"
+    )
+    parser.add_argument(
+        "--estado",
+        type=codigo_estado,
+        default=None,
+        help="Código IBGE ou sigla do estado (padrão: SP, se publicado)",
+    )
+    args = parser.parse_args()
+
+    manifesto = ler_manifesto()
+    try:
+        code_state = escolher_estado(args.estado, manifesto)
+    except (FileNotFoundError, ValueError) as erro:
+        parser.error(str(erro))
+    console.print(f"Exportando {SIGLAS_UF[code_state]}")
+    exportar(args.saida, code_state, versao_dados(code_state, manifesto))
@@ -0,0 +1,263 @@
+import folium
+import branca.colormap as cm
+from folium.plugins import Fullscreen
+
+from espacial import CLASSES_AGRUPAMENTO
+
+# ============================================================================
+# FUNÇÕES DE MAPA
+# ============================================================================
+
+
+def criar_colormap(min_val, max_val, titulo="Taxa Média de Óbitos"):
+    """Cria colormap usando escala Blues do colorbrewer."""
+    return cm.LinearColormap(
+        colors=["#eff3ff", "#bdd7e7", "#6baed6", "#3182bd", "#08519c"],
+        vmin=min_val,
+        vmax=max_val,
+        caption=f"{titulo} (por 100 mil hab.)",
+    )
+
+
+def criar_legenda(min_val, max_val, get_color_func, titulo="Taxa Média de Óbitos"):
+    """Cria HTML da legenda para o mapa."""
+    valores_legenda = [
+        min_val,
+        min_val + (max_val - min_val) * 0.25,
+        min_val + (max_val - min_val) * 0.5,
+        min_val + (max_val - min_val) * 0.75,
+        max_val,
+    ]
+
+    cores_legenda = [get_color_func(v) for v in valores_legenda]
+
+    legenda_html = (
+        """
+<div style="position: fixed;
+     bottom: 50px; right: 50px; width: 200px; height: auto;
+     background-color: white; border:2px solid grey; z-index:9999;
+     font-size:14px; padding: 10px; border-radius: 5px; box-shadow: 0 0 15px rgba(0,0,0,0.2);">
+     <p style="margin-top: 0; margin-bottom: 5px; font-weight: bold; color: #333333;">"""
+        + titulo
+        + """<br/>(por 100 mil hab.)</p>
+"""
+    )
+
+    for i in range(len(valores_legenda) - 1):
+        legenda_html += f"""
+     <div style="display: flex; align-items: center; margin-bottom: 3px;">
+         <div style="width: 30px; height: 20px; background-color: {cores_legenda[i]}; border: 1px solid black; margin-right: 5px;"></div>
+         <span style="color: #333333;">{valores_legenda[i]:.2f} - {valores_legenda[i + 1]:.2f}</span>
+     </div>
+"""
+
+    legenda_html += (
+        """
+     <div style="display: flex; align-items: center;">
+         <div style="width: 30px; height: 20px; background-color: """
+        + cores_legenda[-1]
+        + """; border: 1px solid black; margin-right: 5px;"></div>
+         <span style="color: #333333;">"""
+        + f"{valores_legenda[-1]:.2f}+"
+        + """</span>
+     </div>
+</div>
+"""
+    )
+
+    return legenda_html
+
+
+def preparar_camada(gdf, coluna="taxa_media"):
+    """Calcula cores, limites e o GeoJSON do mapa coroplético da métrica.
+
+    O resultado só tem dados serializáveis (ao contrário do folium.Map) e pode
+    ser guardado em cache.
+    """
+    min_val, max_val = _limites_taxa(gdf, coluna)
+    colormap = criar_colormap(min_val, max_val)
+    # Valores fora dos limites do colormap recebem a cor do limite
+    gdf["color"] = gdf[coluna].clip(min_val, max_val).map(colormap.rgb_hex_str)
+    gdf[f"{coluna}_formatada"] = gdf[coluna].round(2)
+    return {
+        "geojson": gdf.to_json(drop_id=True),
+        "limites": (float(min_val), float(max_val)),
+        "enquadramento": tuple(float(v) for v in gdf.total_bounds),
+    }
+
+
+def criar_mapa(
+    camada,
+    tooltip_fields,
+    tooltip_aliases,
+    location=None,
+    zoom_start=7,
+    weight=1,
+    url_geojson=None,
+    titulo="Taxa Média de Óbitos",
+):
+    """Cria mapa folium com GeoJSON, legenda e fullscreen.
+
+    ``camada`` vem de ``preparar_camada``. Com ``url_geojson`` (endereço
+    relativo de um arquivo com ``camada["geojson"]``, gravado por quem chama),
+    o mapa carrega a geometria desse arquivo em vez de embuti-la no HTML. Sem
+    ``location``, o mapa é centralizado e enquadrado nos limites da camada.
+    """
+    min_val, max_val = camada["limites"]
+    colormap = criar_colormap(min_val, max_val, titulo=titulo)
+
+    # Criar função de cor
+    def get_color(taxa_valor):
+        # Garantir que o valor está dentro dos limites do colormap
+        taxa_valor = max(min_val, min(max_val, taxa_valor))
+        return colormap.rgb_hex_str(taxa_valor)
+
+    # Centralizar nos limites dos dados (qualquer estado)
+    min_x, min_y, max_x, max_y = camada["enquadramento"]
+    enquadrar = location is None
+    if enquadrar:
+        location = [(min_y + max_y) / 2, (min_x + max_x) / 2]
+
+    # Criar mapa
+    m = folium.Map(
+        location=location,
+        zoom_start=zoom_start,
+        tiles="CartoDB positron",
+    )
+
+    # Adicionar fullscreen
+    Fullscreen().add_to(m)
+
+    # Adicionar GeoJSON
+    geojson = folium.GeoJson(
+        camada["geojson"],
+        name=titulo,
+        style_function=lambda feature: {
+            "fillColor": feature["properties"]["color"],
+            "color": "black",
+            "weight": weight,
+            "fillOpacity": 0.7,
+        },
+        tooltip=folium.GeoJsonTooltip(
+            fields=tooltip_fields,
+            aliases=tooltip_aliases,
+            style=("background-color: steelblue; color: white; padding: 10px;"),
+        ),
+    )
+    if url_geojson is not None:
+        # Estilos calculados acima; o navegador busca a geometria no arquivo
+        geojson.embed = False
+        geojson.embed_link = url_geojson
+    geojson.add_to(m)
+    if enquadrar:
+        m.fit_bounds([[min_y, min_x], [max_y, max_x]])
+
+    # Adicionar legenda
+    legenda_html = criar_legenda(min_val, max_val, get_color, titulo)
+    m.get_root().html.add_child(folium.Element(legenda_html))
+
+    return m
+
+
+def _limites_taxa(gdf, coluna="taxa_media"):
+    """Retorna min/max da métrica garantindo min < max."""
+    # Garantir que não há NaN antes de calcular min/max
+    gdf[coluna] = gdf[coluna].fillna(0)
+    min_taxa = gdf[coluna].min()
+    max_taxa = gdf[coluna].max()
+    # Garantir que min < max
+    if min_taxa >= max_taxa:
+        max_taxa = min_taxa + 1 if min_taxa == max_taxa else min_taxa + 0.01
+    return min_taxa, max_taxa
+
+
+def criar_mapa_municipios(
+    dados_municipios,
+    url_geojson=None,
+    coluna="taxa_media",
+    titulo="Taxa Média de Óbitos",
+    rotulo="Taxa Média",
+    camada=None,
+):
+    """Cria o mapa coroplético de municípios (``camada`` já pronta, se houver)."""
+    if camada is None:
+        camada = preparar_camada(dados_municipios, coluna)
+    return criar_mapa(
+        camada,
+        tooltip_fields=["name_muni", "Superintendência", f"{coluna}_formatada"],
+        tooltip_aliases=["Município:", "Superintendência:", f"{rotulo}:"],
+        weight=1,
+        url_geojson=url_geojson,
+        titulo=titulo,
+    )
+
+
+def criar_mapa_superintendencias(
+    dados_superintendencias,
+    url_geojson=None,
+    coluna="taxa_media",
+    titulo="Taxa Média de Óbitos",
+    rotulo="Taxa Média",
+    camada=None,
+):
+    """Cria o mapa coroplético de superintendências (``camada`` já pronta, se houver)."""
+    if camada is None:
+        camada = preparar_camada(dados_superintendencias, coluna)
+    return criar_mapa(
+        camada,
+        tooltip_fields=["Superintendência", f"{coluna}_formatada"],
+        tooltip_aliases=["Superintendência:", f"{rotulo}:"],
+        weight=2,
+        url_geojson=url_geojson,
+        titulo=titulo,
+    )
+
+
+def preparar_camada_agrupamentos(gdf, tooltip_field):
+    """GeoJSON da camada de agrupamentos espaciais (serializável, para cache).
+
+    ``gdf`` deve trazer as colunas de ``espacial.calcular_agrupamentos``.
+    """
+    camada = gdf[[tooltip_field, "agrupamento", "ponto_quente_frio", "geometry"]]
+    camada = camada.assign(
+        moran_local_p=gdf["moran_local_p"].round(3).fillna(1.0),
+        vizinhos_ausentes=gdf["vizinhos_ausentes"],
+    )
+    return camada.to_json(drop_id=True)
+
+
+def adicionar_camada_agrupamentos(m, geojson, tooltip_field, tooltip_alias):
+    """Adiciona ao mapa a camada (desligada por padrão) de agrupamentos espaciais.
+
+    ``geojson`` vem de ``preparar_camada_agrupamentos``.
+    """
+    folium.GeoJson(
+        geojson,
+        name="Agrupamentos espaciais (Moran local / Gi*)",
+        show=False,
+        style_function=lambda feature: {
+            "fillColor": CLASSES_AGRUPAMENTO[feature["properties"]["agrupamento"]],
+            "color": "black",
+            "weight": 0.5,
+            "fillOpacity": 0.8,
+        },
+        tooltip=folium.GeoJsonTooltip(
+            fields=[
+                tooltip_field,
+                "agrupamento",
+                "ponto_quente_frio",
+                "moran_local_p",
+                "vizinhos_ausentes",
+            ],
+            aliases=[
+                tooltip_alias,
+                "Agrupamento:",
+                "Gi*:",
+                "p (Moran local):",
+                "Vizinhos sem dados (estado não publicado):",
+            ],
+            style=("background-color: steelblue; color: white; padding: 10px;"),
+        ),
+    ).add_to(m)
+    folium.LayerControl(collapsed=False).add_to(m)
+    return m
@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+
+from estratos import ROTULOS_FAIXAS_ETARIAS, SEXOS
+
+# ============================================================================
+# TAXAS PADRONIZADAS POR IDADE E SEXO
+# ============================================================================
+#
+# População e óbitos ficam em arrays densos unidade × ano × faixa etária × sexo;
+# todas as unidades (municípios ou superintendências) são calculadas de uma vez
+# com operações sobre os eixos, sem laços por grupo.
+
+
+def montar_arrays(estrutura, obitos_totais):
+    """Monta arrays densos município × ano × faixa etária × sexo.
+
+    ``estrutura`` traz população e óbitos por (cod_ibge, ano, faixa_etaria, sexo);
+    ``obitos_totais`` traz ``quantidade_obitos`` por (cod_ibge, ano) e serve para
+    redistribuir os óbitos sem idade ou sexo conhecidos.
+    """
+    codigos, i_municipio = np.unique(estrutura["cod_ibge"], return_inverse=True)
+    anos, i_ano = np.unique(estrutura["ano"], return_inverse=True)
+    i_faixa = pd.Categorical(
+        estrutura["faixa_etaria"], categories=ROTULOS_FAIXAS_ETARIAS
+    ).codes
+    i_sexo = pd.Categorical(estrutura["sexo"], categories=SEXOS).codes
+    # Estratos fora das categorias (código -1) são descartados
+    validos = (i_faixa >= 0) & (i_sexo >= 0)
+    indices = (i_municipio[validos], i_ano[validos], i_faixa[validos], i_sexo[validos])
+
+    forma = (len(codigos), len(anos), len(ROTULOS_FAIXAS_ETARIAS), len(SEXOS))
+    populacao = np.zeros(forma)
+    obitos = np.zeros(forma)
+    np.add.at(populacao, indices, estrutura["populacao"].to_numpy(dtype=float)[validos])
+    np.add.at(obitos, indices, estrutura["obitos"].to_numpy(dtype=float)[validos])
+
+    # Óbitos totais alinhados aos eixos município × ano
+    totais = obitos_totais[
+        obitos_totais["cod_ibge"].isin(codigos) & obitos_totais["ano"].isin(anos)
+    ]
+    total = np.zeros(forma[:2])
+    np.add.at(
+        total,
+        (
+            np.searchsorted(codigos, totais["cod_ibge"]),
+            np.searchsorted(anos, totais["ano"]),
+        ),
+        totais["quantidade_obitos"].to_numpy(dtype=float),
+    )
+
+    # Redistribuir óbitos sem idade/sexo proporcionalmente aos óbitos conhecidos
+    # do município no ano (ou à população, quando não há óbito conhecido)
+    conhecidos = obitos.sum(axis=(2, 3))
+    faltantes = np.clip(total - conhecidos, 0, None)[..., None, None]
+    base = np.where(conhecidos[..., None, None] > 0, obitos, populacao)
+    soma_base = base.sum(axis=(2, 3), keepdims=True)
+    proporcao = np.divide(base, soma_base, out=np.zeros_like(base), where=soma_base > 0)
+    obitos = obitos + faltantes * proporcao
+
+    return {
+        "codigos": codigos,
+        "anos": anos,
+        "populacao": populacao,
+        "obitos": obitos,
+    }
+
+
+def agrupar_arrays(arrays, grupos):
+    """Soma os arrays dos municípios por grupo (ex.: superintendência).
+
+    ``grupos`` é alinhado a ``arrays["codigos"]``; municípios sem grupo (NaN)
+    ficam de fora. A soma é um único produto com a matriz indicadora.
+    """
+    grupos = pd.Series(grupos)
+    validos = grupos.notna().to_numpy()
+    rotulos, i_grupo = np.unique(grupos[validos].astype(str), return_inverse=True)
+    indicadora = np.zeros((len(rotulos), len(grupos)))
+    indicadora[i_grupo, np.flatnonzero(validos)] = 1
+    return {
+        "codigos": rotulos,
+        "anos": arrays["anos"],
+        "populacao": np.tensordot(indicadora, arrays["populacao"], axes=1),
+        "obitos": np.tensordot(indicadora, arrays["obitos"], axes=1),
+    }
+
+
+def _limites_poisson(observados, z):
+    """Limites de confiança aproximados de Byar para contagens de Poisson."""
+    o = np.asarray(observados, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inferior = np.where(
+            o > 0, o * (1 - 1 / (9 * o) - z / (3 * np.sqrt(o))) ** 3, 0.0
+        )
+    o1 = o + 1
+    superior = o1 * (1 - 1 / (9 * o1) + z / (3 * np.sqrt(o1))) ** 3
+    return np.clip(inferior, 0, None), superior
+
+
+def calcular_taxas_padronizadas(arrays, padrao=None, z=1.959964, por=100000):
+    """Calcula taxas bruta, padronizada direta e indireta com IC para cada unidade.
+
+    Anos são somados (pessoas-ano). A população padrão é a soma de ``padrao``
+    (por padrão, o próprio conjunto de unidades, isto é, o estado). Os IC
+    usam Byar para a contagem de óbitos, o método de Dobson para a taxa direta
+    e a razão de mortalidade padronizada (RMP) para a indireta.
+    """
+    if padrao is None:
+        padrao = arrays
+    populacao = arrays["populacao"].sum(axis=1)
+    obitos = arrays["obitos"].sum(axis=1)
+    populacao_padrao = padrao["populacao"].sum(axis=(0, 1))
+    obitos_padrao = padrao["obitos"].sum(axis=(0, 1))
+
+    pesos = populacao_padrao / populacao_padrao.sum()
+    taxas_padrao = np.divide(
+        obitos_padrao,
+        populacao_padrao,
+        out=np.zeros_like(obitos_padrao),
+        where=populacao_padrao > 0,
+    )
+    taxas_especificas = np.divide(
+        obitos, populacao, out=np.zeros_like(obitos), where=populacao > 0
+    )
+
+    observados = obitos.sum(axis=(1, 2))
+    pessoas_ano = populacao.sum(axis=(1, 2))
+    taxa_bruta = np.divide(
+        observados, pessoas_ano, out=np.zeros_like(observados), where=pessoas_ano > 0
+    )
+    inferior, superior = _limites_poisson(observados, z)
+
+    # Padronização direta: média das taxas específicas ponderada pela população padrão
+    taxa_direta = (pesos * taxas_especificas).sum(axis=(1, 2))
+    # Dobson: sqrt(var/O) com a fração de óbitos por estrato (ou de população,
+    # quando não há óbitos) para que unidades sem óbitos também tenham IC
+    fracao = np.where(
+        observados[:, None, None] > 0,
+        np.divide(
+            obitos,
+            observados[:, None, None],
+            out=np.zeros_like(obitos),
+            where=observados[:, None, None] > 0,
+        ),
+        np.divide(
+            populacao,
+            pessoas_ano[:, None, None],
+            out=np.zeros_like(populacao),
+            where=pessoas_ano[:, None, None] > 0,
+        ),
+    )
+    fator = np.sqrt(
+        (
+            pesos**2
+            * np.divide(
+                fracao, populacao**2, out=np.zeros_like(fracao), where=populacao > 0
+            )
+        ).sum(axis=(1, 2))
+    )
+    direta_inferior = np.clip(taxa_direta + fator * (inferior - observados), 0, None)
+    direta_superior = taxa_direta + fator * (superior - observados)
+
+    # Padronização indireta: óbitos esperados com as taxas específicas do padrão
+    esperados = (populacao * taxas_padrao).sum(axis=(1, 2))
+    rmp = np.divide(
+        observados, esperados, out=np.full_like(observados, np.nan), where=esperados > 0
+    )
+    rmp_inferior = np.divide(
+        inferior, esperados, out=np.full_like(inferior, np.nan), where=esperados > 0
+    )
+    rmp_superior = np.divide(
+        superior, esperados, out=np.full_like(superior, np.nan), where=esperados > 0
+    )
+    taxa_bruta_padrao = obitos_padrao.sum() / populacao_padrao.sum()
+
+    return pd.DataFrame(
+        {
+            "codigo": arrays["codigos"],
+            "obitos_observados": observados,
+            "obitos_esperados": esperados,
+            "pessoas_ano": pessoas_ano,
+            "taxa_bruta": taxa_bruta * por,
+            "taxa_padronizada_direta": taxa_direta * por,
+            "taxa_padronizada_direta_ic_inf": direta_inferior * por,
+            "taxa_padronizada_direta_ic_sup": direta_superior * por,
+            "rmp": rmp,
+            "rmp_ic_inf": rmp_inferior,
+            "rmp_ic_sup": rmp_superior,
+            "taxa_padronizada_indireta": rmp * taxa_bruta_padrao * por,
+            "taxa_padronizada_indireta_ic_inf": rmp_inferior * taxa_bruta_padrao * por,
+            "taxa_padronizada_indireta_ic_sup": rmp_superior * taxa_bruta_padrao * por,
+        }
+    )
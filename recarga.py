@@ -0,0 +1,126 @@
+import os
+import subprocess
+import sys
+import threading
+import streamlit as st
+from rich.console import Console
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+from dados import (
+    MAX_ESTADOS_EM_MEMORIA,
+    PATH_MANIFESTO,
+    ler_manifesto,
+    listar_metricas,
+    preparar_painel,
+    versao_dados,
+)
+
+console = Console()
+
+PATH_AQUECER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "aquecer.py")
+
+# ============================================================================
+# RECARGA A QUENTE DOS DADOS PUBLICADOS
+# ============================================================================
+#
+# O sysdata.py grava cada versão em um diretório próprio e só então troca o
+# manifesto (os.replace, atômico). Aqui o manifesto é observado; uma versão
+# nova é pré-aquecida em segundo plano e só depois passa a ser servida, de uma
+# vez, a todas as sessões. Enquanto isso as sessões seguem na versão anterior.
+#
+# O pré-aquecimento de todos os estados roda em outro processo (aquecer.py) e
+# só preenche o cache em disco: carregá-los na memória deste processo desfaria
+# o carregamento por estado. Antes da troca, os estados e indicadores que este
+# processo vinha exibindo são montados em memória na versão nova (partição,
+# índices e detalhe), para que a primeira execução após a troca não os
+# reconstrua. As entradas da versão anterior deixam os caches pelos limites
+# de entradas (max_entries) à medida que as novas são usadas.
+
+
+class _ObservadorManifesto(FileSystemEventHandler):
+    """Sinaliza quando o manifesto é criado, alterado ou substituído."""
+
+    def __init__(self, sinal):
+        self.sinal = sinal
+        self.path_manifesto = os.path.abspath(PATH_MANIFESTO)
+
+    def on_any_event(self, event):
+        caminhos = [event.src_path, getattr(event, "dest_path", "")]
+        if self.path_manifesto in map(os.path.abspath, filter(None, caminhos)):
+            self.sinal.set()
+
+
+class PublicacaoAtiva:
+    """Manifesto servido a todas as sessões, trocado após o pré-aquecimento."""
+
+    def __init__(self):
+        self.manifesto = ler_manifesto()
+        self._sinal = threading.Event()
+        # {code_state: {métricas}} exibidos, do uso mais antigo ao mais recente
+        self._em_uso = {}
+        self._trava_em_uso = threading.Lock()
+
+        observador = Observer()
+        observador.schedule(
+            _ObservadorManifesto(self._sinal),
+            os.path.dirname(os.path.abspath(PATH_MANIFESTO)),
+        )
+        observador.daemon = True
+        observador.start()
+        threading.Thread(
+            target=self._recarregar, name="recarga-dados", daemon=True
+        ).start()
+
+    def registrar_uso(self, code_state, metrica):
+        """Anota o estado e o indicador exibidos, para aquecê-los na próxima versão."""
+        with self._trava_em_uso:
+            metricas = self._em_uso.pop(code_state, set())
+            metricas.add(metrica)
+            self._em_uso[code_state] = metricas
+            # Só os estados mais recentes cabem nos caches em memória
+            while len(self._em_uso) > MAX_ESTADOS_EM_MEMORIA:
+                del self._em_uso[next(iter(self._em_uso))]
+
+    def _aquecer_em_memoria(self, manifesto):
+        """Monta na versão nova os painéis em uso (o disco já foi aquecido)."""
+        with self._trava_em_uso:
+            em_uso = [(code_state, sorted(m)) for code_state, m in self._em_uso.items()]
+        for code_state, metricas in em_uso:
+            if code_state not in manifesto["estados"]:
+                continue
+            versao = versao_dados(code_state, manifesto)
+            for metrica in metricas:
+                if metrica in listar_metricas(versao):
+                    preparar_painel(code_state, metrica, versao)
+
+    def _recarregar(self):
+        while True:
+            self._sinal.wait()
+            self._sinal.clear()
+            manifesto = ler_manifesto()
+            if manifesto is None or (
+                self.manifesto is not None
+                and manifesto["versao"] == self.manifesto["versao"]
+            ):
+                continue
+            console.print(f"Pré-aquecendo a versão {manifesto['versao']}")
+            try:
+                subprocess.run(
+                    [sys.executable, PATH_AQUECER, "--versao", manifesto["versao"]],
+                    check=True,
+                )
+                self._aquecer_em_memoria(manifesto)
+            except Exception:
+                # Segue servindo a versão anterior; a próxima publicação tenta de novo
+                console.print_exception()
+                continue
+            # Atribuição única: a próxima execução de qualquer sessão já usa a nova
+            self.manifesto = manifesto
+            console.print(f"Versão {manifesto['versao']} em uso")
+
+
+@st.cache_resource
+def obter_publicacao():
+    """Publicação compartilhada pelo processo (observador iniciado uma única vez)."""
+    return PublicacaoAtiva()
@@ -1,92 +1,558 @@
-import pandas as pd
+import argparse
+import hashlib
+import json
 import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import pandas as pd
 from rich.console import Console
 from geobr import read_municipality
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from espacial import TOLERANCIA_SIMPLIFICACAO, construir_vizinhanca
+from estados import SIGLAS_UF, codigo_estado
+from estratos import classificar_faixa_etaria, normalizar_sexo
 
 console = Console()
 
+# Caminhos de entrada. "{uf}" (opcional) é substituído pela sigla do estado,
+# permitindo um arquivo por estado; sem o marcador o arquivo é compartilhado:
+# com mais de um estado, é lido uma única vez e repartido por prefixo do código
+# IBGE antes de iniciar os processos (ver particionar_entradas).
 path_pessoas = "data/infosiga/pessoas_2022-2025.csv"
 path_populacao = "data/estimativa_pop_idade_sexo_esp.csv"
 path_cetran = "data/base_cetran.csv"
-path_sysdata = "data/sysdata.gpkg"
 
-console.print(f"Carregando dados de pessoas de {path_pessoas}")
-pessoas_df = pd.read_csv(path_pessoas, encoding="latin-1", sep=";")
+# Publicação: cada execução grava uma versão nova em <dir_versoes>/<versão>/ e
+# só no fim troca (atomicamente) o manifesto lido pelo painel
+path_manifesto = "data/manifesto.json"
+dir_versoes = "data/versoes"
+versoes_mantidas = 3
+
+# Saídas de cada versão, particionadas por estado: <dir>/code_state=<código>/...
+dir_sysdata = "sysdata"
+dir_detalhe = "detalhe"
+dir_estrutura = "estrutura"
+dir_vizinhanca = "vizinhanca"
+diretorios_saida = [dir_sysdata, dir_detalhe, dir_estrutura, dir_vizinhanca]
 
-pessoas_fatais_moto = pessoas_df[
-    (pessoas_df["gravidade_lesao"] == "FATAL")
-    & (pessoas_df["tipo_veiculo_vitima"] == "MOTOCICLETA")
-    & (pessoas_df["ano_obito"].isin([2022, 2023, 2024]))
+anos = [2022, 2023, 2024]
+
+# Colunas mantidas no detalhe por vítima (as ausentes no extrato são ignoradas)
+colunas_detalhe = [
+    "cod_ibge",
+    "ano_obito",
+    "mes_obito",
+    "idade",
+    "sexo",
+    "tipo_de_vitima",
 ]
 
-console.print("Calculando óbitos por ano e município")
-
-obitos_por_ano_municipio = (
-    pessoas_fatais_moto.groupby(["ano_obito", "cod_ibge"])
-    .size()
-    .reset_index(name="quantidade_obitos")
-    .reset_index(drop=True)
-)
-
-populacao_df = pd.read_csv(
-    path_populacao,
-    encoding="latin-1",
-    sep=";",
-)
-
-console.print("Calculando população por ano e município")
-
-populacao_2022_2024_por_municipio = (
-    populacao_df[populacao_df["ano"].isin([2022, 2023, 2024])]
-    .groupby(["ano", "cod_ibge"])["populacao"]
-    .sum()
-    .reset_index(name="populacao_total")
-    .reset_index(drop=True)
-)
-
-cetran_df = pd.read_csv(
-    path_cetran,
-    encoding="utf-8",
-    sep=";",
-)
-
-cetran_superintendencia_ibge = cetran_df[["Superintendência", "CD_MUN"]].reset_index(
-    drop=True
-)
-
-console.print("Juntando dados")
-
-dados_completos = (
-    populacao_2022_2024_por_municipio.merge(
-        obitos_por_ano_municipio,
-        left_on=["ano", "cod_ibge"],
-        right_on=["ano_obito", "cod_ibge"],
-        how="left",
-    )
-    .merge(
-        cetran_superintendencia_ibge,
-        left_on="cod_ibge",
-        right_on="CD_MUN",
-        how="left",
-    )
-    .drop(columns=["ano_obito", "CD_MUN"])
-    .fillna({"quantidade_obitos": 0})
-    .reset_index(drop=True)
-)
-
-console.print("Carregando os dados espaciais de São Paulo")
-
-sp_gdf = read_municipality(code_muni=35, year=2022)
-
-console.print("Criando os dados finais")
-
-dados_completos_geo = sp_gdf.merge(
-    dados_completos,
-    left_on="code_muni",
-    right_on="cod_ibge",
-    how="right",
-)
-
-dados_completos_geo.to_file(path_sysdata, driver="GPKG")
-
-console.print(f"Dados salvos em {path_sysdata}")
+
+def _dir_estado(dir_versao, diretorio, code_state):
+    return os.path.join(dir_versao, diretorio, f"code_state={code_state}")
+
+
+def _vincular(origem, destino):
+    """Hard link (artefatos publicados nunca são alterados); cópia se não suportado."""
+    try:
+        os.link(origem, destino)
+    except OSError:
+        shutil.copy2(origem, destino)
+
+
+def _filtrar_estado(df, code_state, coluna="cod_ibge"):
+    """Mantém só as linhas cujo código IBGE pertence ao estado."""
+    return df[df[coluna] // 100000 == code_state]
+
+
+def _filtrar_pessoas(pessoas_df):
+    """Óbitos de ocupantes de motocicleta nos anos analisados."""
+    return pessoas_df[
+        (pessoas_df["gravidade_lesao"] == "FATAL")
+        & (pessoas_df["tipo_veiculo_vitima"] == "MOTOCICLETA")
+        & (pessoas_df["ano_obito"].isin(anos))
+    ]
+
+
+def _filtrar_populacao(populacao_df):
+    """População nos anos analisados."""
+    return populacao_df[populacao_df["ano"].isin(anos)]
+
+
+def _ler_pessoas(path):
+    colunas_pessoas = {"gravidade_lesao", "tipo_veiculo_vitima", *colunas_detalhe}
+    return pd.read_csv(
+        path,
+        encoding="latin-1",
+        sep=";",
+        usecols=lambda c: c in colunas_pessoas,
+    )
+
+
+def _ler_populacao(path):
+    return pd.read_csv(path, encoding="latin-1", sep=";")
+
+
+# Entradas que podem ser compartilhadas entre estados: nome -> (caminho,
+# leitura, filtro aplicado antes de repartir)
+ENTRADAS = {
+    "pessoas": (path_pessoas, _ler_pessoas, _filtrar_pessoas),
+    "populacao": (path_populacao, _ler_populacao, _filtrar_populacao),
+}
+
+
+def _ler_entrada(nome, sigla, fatias=None):
+    """Lê a entrada do estado: a fatia já repartida, se houver, ou o CSV."""
+    if fatias and nome in fatias:
+        return pd.read_pickle(fatias[nome])
+    caminho, ler, _ = ENTRADAS[nome]
+    path_uf = caminho.format(uf=sigla)
+    console.print(f"[{sigla}] Lendo {path_uf}")
+    return ler(path_uf)
+
+
+def particionar_entradas(estados, dir_saida):
+    """Lê cada CSV compartilhado uma única vez e grava a fatia de cada estado.
+
+    Sem isso, cada processo leria o arquivo nacional inteiro para ficar só com
+    o próprio estado. Entradas com "{uf}" no caminho (um arquivo por estado) e
+    execuções de um único estado ficam como estão. Retorna
+    ``{code_state: {entrada: caminho da fatia}}``.
+    """
+    fatias = {code_state: {} for code_state in estados}
+    if len(estados) < 2:
+        return fatias
+    for nome, (caminho, ler, filtrar) in ENTRADAS.items():
+        if "{uf}" in caminho:
+            continue
+        console.print(f"Repartindo {caminho} por estado")
+        df = filtrar(ler(caminho))
+        prefixos = df["cod_ibge"] // 100000
+        for code_state in estados:
+            path_fatia = os.path.join(dir_saida, f"{nome}_{code_state}.pkl")
+            df[prefixos == code_state].to_pickle(path_fatia)
+            fatias[code_state][nome] = path_fatia
+        del df, prefixos
+    return fatias
+
+
+def gravar_detalhe(pessoas_fatais_moto, dir_saida, sigla):
+    """Grava o detalhe dos óbitos ordenado e indexado por município e ano."""
+    colunas_ausentes = [
+        c for c in colunas_detalhe if c not in pessoas_fatais_moto.columns
+    ]
+    if colunas_ausentes:
+        console.print(
+            f"[yellow][{sigla}] Colunas ausentes no extrato: {colunas_ausentes}[/yellow]"
+        )
+
+    # Ordenado por município e ano para que cada par ocupe uma faixa contínua de linhas
+    detalhe_obitos = (
+        pessoas_fatais_moto[[c for c in colunas_detalhe if c not in colunas_ausentes]]
+        .sort_values(["cod_ibge", "ano_obito"], kind="stable")
+        .reset_index(drop=True)
+    )
+    detalhe_obitos["cod_ibge"] = detalhe_obitos["cod_ibge"].astype("int32")
+    detalhe_obitos["ano_obito"] = detalhe_obitos["ano_obito"].astype("int16")
+    for coluna in ["mes_obito", "idade"]:
+        if coluna in detalhe_obitos.columns:
+            detalhe_obitos[coluna] = pd.to_numeric(
+                detalhe_obitos[coluna], errors="coerce"
+            ).astype("Int16")
+    for coluna in ["sexo", "tipo_de_vitima"]:
+        if coluna in detalhe_obitos.columns:
+            detalhe_obitos[coluna] = detalhe_obitos[coluna].astype("category")
+
+    indice_detalhe = (
+        detalhe_obitos.groupby(["cod_ibge", "ano_obito"])
+        .size()
+        .reset_index(name="quantidade")
+    )
+    indice_detalhe["fim"] = indice_detalhe["quantidade"].cumsum()
+    indice_detalhe["inicio"] = indice_detalhe["fim"] - indice_detalhe["quantidade"]
+
+    # Sem compressão para permitir leitura via memory map sem cópia
+    os.makedirs(dir_saida, exist_ok=True)
+    detalhe_obitos.to_feather(
+        os.path.join(dir_saida, "detalhe_obitos.arrow"), compression="uncompressed"
+    )
+    indice_detalhe.to_feather(
+        os.path.join(dir_saida, "detalhe_obitos_indice.arrow"),
+        compression="uncompressed",
+    )
+    return len(detalhe_obitos)
+
+
+def gravar_estrutura(populacao_df, pessoas_fatais_moto, dir_saida, sigla):
+    """Grava população e óbitos por município, ano, faixa etária e sexo.
+
+    Óbitos sem idade ou sexo conhecidos ficam de fora; a redistribuição deles
+    é feita no cálculo das taxas padronizadas.
+    """
+    for nome, df in [("população", populacao_df), ("pessoas", pessoas_fatais_moto)]:
+        if not {"idade", "sexo"} <= set(df.columns):
+            console.print(
+                f"[yellow][{sigla}] Sem idade/sexo em {nome}; "
+                "taxas padronizadas não serão geradas[/yellow]"
+            )
+            return 0
+
+    chaves = ["ano", "cod_ibge", "faixa_etaria", "sexo"]
+    populacao_estrutura = (
+        populacao_df.assign(
+            faixa_etaria=classificar_faixa_etaria(populacao_df["idade"]),
+            sexo=normalizar_sexo(populacao_df["sexo"]),
+        )
+        .groupby(chaves, observed=True)["populacao"]
+        .sum()
+        .reset_index()
+    )
+    obitos_estrutura = (
+        pessoas_fatais_moto.rename(columns={"ano_obito": "ano"})
+        .assign(
+            faixa_etaria=classificar_faixa_etaria(pessoas_fatais_moto["idade"]),
+            sexo=normalizar_sexo(pessoas_fatais_moto["sexo"]),
+        )
+        .groupby(chaves, observed=True)
+        .size()
+        .reset_index(name="obitos")
+    )
+    estrutura = populacao_estrutura.merge(obitos_estrutura, on=chaves, how="left")
+    estrutura["obitos"] = estrutura["obitos"].fillna(0).astype("int32")
+
+    os.makedirs(dir_saida, exist_ok=True)
+    estrutura.to_parquet(os.path.join(dir_saida, "estrutura_idade_sexo.parquet"))
+    return len(estrutura)
+
+
+def carregar_municipios_brasil():
+    """Malha municipal do país, sem a simplificação do geobr.
+
+    Lida uma única vez: serve à vizinhança e, repartida por estado em
+    ``particionar_geometrias``, à geometria de cada partição.
+    """
+    console.print("Carregando os municípios do país")
+    return read_municipality(code_muni="all", year=2022, simplified=False)
+
+
+def particionar_geometrias(brasil_gdf, estados, dir_saida, fatias):
+    """Grava em ``fatias`` a geometria de cada estado, recortada da malha nacional."""
+    prefixos = brasil_gdf["code_muni"].astype("int64") // 100000
+    for code_state in estados:
+        path_fatia = os.path.join(dir_saida, f"geometria_{code_state}.pkl")
+        brasil_gdf[prefixos == code_state].reset_index(drop=True).to_pickle(path_fatia)
+        fatias[code_state]["geometria"] = path_fatia
+    return fatias
+
+
+def gravar_vizinhanca(brasil_gdf, estados, dir_versao, dir_anterior=None):
+    """Grava a vizinhança dos municípios de cada estado, calculada no país inteiro.
+
+    Municípios de divisa também têm vizinhos nos estados ao lado; calculada por
+    estado, a vizinhança perderia essas arestas. As arestas saem de uma única
+    consulta ao índice espacial de todos os municípios do país e cada estado
+    guarda as que partem dele. O arquivo guarda o hash das geometrias e é
+    reaproveitado da versão anterior enquanto elas não mudam.
+    """
+    ordenado = brasil_gdf.sort_values("code_muni")
+    hash_geometrias = hashlib.sha1(
+        ordenado["code_muni"].astype("int64").to_numpy().tobytes()
+        + b"".join(ordenado.geometry.to_wkb())
+    ).hexdigest()
+
+    vizinhanca = None
+    for code_state in estados:
+        sigla = SIGLAS_UF[code_state]
+        dir_saida = _dir_estado(dir_versao, dir_vizinhanca, code_state)
+        os.makedirs(dir_saida, exist_ok=True)
+        path_vizinhanca = os.path.join(dir_saida, "vizinhanca.parquet")
+
+        path_anterior = (
+            os.path.join(
+                _dir_estado(dir_anterior, dir_vizinhanca, code_state),
+                "vizinhanca.parquet",
+            )
+            if dir_anterior
+            else None
+        )
+        if path_anterior and os.path.exists(path_anterior):
+            metadados = pq.read_schema(path_anterior).metadata or {}
+            if metadados.get(b"hash_geometrias") == hash_geometrias.encode():
+                console.print(f"[{sigla}] Vizinhança inalterada, reaproveitando")
+                _vincular(path_anterior, path_vizinhanca)
+                continue
+
+        if vizinhanca is None:
+            console.print("Calculando vizinhança entre os municípios do país")
+            vizinhanca = construir_vizinhanca(brasil_gdf, coluna="code_muni")
+        tabela = pa.Table.from_pandas(
+            vizinhanca[vizinhanca["origem"] // 100000 == code_state],
+            preserve_index=False,
+        )
+        tabela = tabela.replace_schema_metadata(
+            {**(tabela.schema.metadata or {}), b"hash_geometrias": hash_geometrias}
+        )
+        pq.write_table(tabela, path_vizinhanca)
+        console.print(f"[{sigla}] Vizinhança gravada ({tabela.num_rows} arestas)")
+
+
+def processar_estado(code_state, tolerancia, dir_versao, fatias=None):
+    """Ingestão, agregação, geometria e simplificação de um estado.
+
+    Executado em um processo separado por estado; grava a partição do estado
+    em ``dir_versao`` e retorna o caminho do arquivo gerado e o número de
+    linhas. ``fatias`` são as entradas já repartidas por
+    ``particionar_entradas`` e ``particionar_geometrias``.
+    """
+    sigla = SIGLAS_UF[code_state]
+
+    console.print(f"[{sigla}] Carregando dados de pessoas")
+    pessoas_fatais_moto = _filtrar_estado(
+        _filtrar_pessoas(_ler_entrada("pessoas", sigla, fatias)), code_state
+    )
+
+    console.print(f"[{sigla}] Calculando óbitos por ano e município")
+
+    obitos_por_ano_municipio = (
+        pessoas_fatais_moto.groupby(["ano_obito", "cod_ibge"])
+        .size()
+        .reset_index(name="quantidade_obitos")
+        .reset_index(drop=True)
+    )
+
+    console.print(f"[{sigla}] Gravando detalhe dos óbitos por município")
+
+    n_detalhe = gravar_detalhe(
+        pessoas_fatais_moto,
+        _dir_estado(dir_versao, dir_detalhe, code_state),
+        sigla,
+    )
+
+    populacao_df = _ler_entrada("populacao", sigla, fatias)
+
+    console.print(f"[{sigla}] Calculando população por ano e município")
+
+    populacao_df = _filtrar_estado(_filtrar_populacao(populacao_df), code_state)
+    populacao_por_municipio = (
+        populacao_df.groupby(["ano", "cod_ibge"])["populacao"]
+        .sum()
+        .reset_index(name="populacao_total")
+        .reset_index(drop=True)
+    )
+
+    console.print(f"[{sigla}] Gravando população e óbitos por faixa etária e sexo")
+
+    gravar_estrutura(
+        populacao_df,
+        pessoas_fatais_moto,
+        _dir_estado(dir_versao, dir_estrutura, code_state),
+        sigla,
+    )
+
+    # Mapeamento CETRAN de superintendências (só existe para alguns estados)
+    path_cetran_uf = path_cetran.format(uf=sigla)
+    if os.path.exists(path_cetran_uf):
+        cetran_df = pd.read_csv(
+            path_cetran_uf,
+            encoding="utf-8",
+            sep=";",
+        )
+        cetran_superintendencia_ibge = _filtrar_estado(
+            cetran_df[["Superintendência", "CD_MUN"]].dropna(subset=["CD_MUN"]),
+            code_state,
+            coluna="CD_MUN",
+        ).reset_index(drop=True)
+    else:
+        cetran_superintendencia_ibge = pd.DataFrame(
+            {
+                "Superintendência": pd.Series(dtype="object"),
+                "CD_MUN": pd.Series(dtype="int64"),
+            }
+        )
+
+    console.print(f"[{sigla}] Juntando dados")
+
+    dados_completos = (
+        populacao_por_municipio.merge(
+            obitos_por_ano_municipio,
+            left_on=["ano", "cod_ibge"],
+            right_on=["ano_obito", "cod_ibge"],
+            how="left",
+        )
+        .merge(
+            cetran_superintendencia_ibge,
+            left_on="cod_ibge",
+            right_on="CD_MUN",
+            how="left",
+        )
+        .drop(columns=["ano_obito", "CD_MUN"])
+        .fillna({"quantidade_obitos": 0})
+        .reset_index(drop=True)
+    )
+
+    console.print(f"[{sigla}] Carregando os dados espaciais")
+
+    if fatias and "geometria" in fatias:
+        uf_gdf = pd.read_pickle(fatias["geometria"])
+    else:
+        uf_gdf = read_municipality(code_muni=code_state, year=2022, simplified=False)
+
+    if tolerancia > 0:
+        uf_gdf["geometry"] = uf_gdf.geometry.simplify(
+            tolerancia, preserve_topology=True
+        )
+
+    console.print(f"[{sigla}] Criando os dados finais")
+
+    dados_completos_geo = uf_gdf.merge(
+        dados_completos,
+        left_on="code_muni",
+        right_on="cod_ibge",
+        how="right",
+    )
+    # Chave de partição preenchida também para municípios sem geometria
+    dados_completos_geo["code_state"] = code_state
+
+    dir_particao = _dir_estado(dir_versao, dir_sysdata, code_state)
+    os.makedirs(dir_particao, exist_ok=True)
+    path_particao = os.path.join(dir_particao, "sysdata.parquet")
+    dados_completos_geo.to_parquet(path_particao)
+
+    console.print(
+        f"[{sigla}] Dados salvos em {path_particao} ({n_detalhe} óbitos no detalhe)"
+    )
+    return path_particao, len(dados_completos_geo)
+
+
+def herdar_estado(code_state, dir_anterior, dir_versao):
+    """Leva para a nova versão os artefatos de um estado que não foi reprocessado."""
+    for diretorio in diretorios_saida:
+        origem = _dir_estado(dir_anterior, diretorio, code_state)
+        if os.path.isdir(origem):
+            shutil.copytree(
+                origem,
+                _dir_estado(dir_versao, diretorio, code_state),
+                copy_function=_vincular,
+            )
+
+
+def publicar(id_versao, estados):
+    """Troca o manifesto para a nova versão de uma só vez (os.replace é atômico)."""
+    manifesto = {
+        "versao": id_versao,
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "estados": sorted(estados),
+    }
+    path_temporario = path_manifesto + ".tmp"
+    with open(path_temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path_temporario, path_manifesto)
+
+
+def remover_versoes_antigas(id_versao):
+    """Mantém só as versões mais recentes (painéis ainda podem estar lendo-as)."""
+    versoes = sorted(v for v in os.listdir(dir_versoes) if v != id_versao)
+    for versao in versoes[: max(0, len(versoes) - (versoes_mantidas - 1))]:
+        shutil.rmtree(os.path.join(dir_versoes, versao), ignore_errors=True)
+
+
+def _ler_manifesto():
+    if not os.path.exists(path_manifesto):
+        return None
+    with open(path_manifesto, encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Gera os dados do painel, um processo por estado."
+    )
+    parser.add_argument(
+        "--estados",
+        nargs="+",
+        type=codigo_estado,
+        default=[35],
+        help="Códigos IBGE ou siglas dos estados (padrão: SP)",
+    )
+    parser.add_argument(
+        "--todos", action="store_true", help="Processa todos os estados do país"
+    )
+    parser.add_argument(
+        "--processos",
+        type=int,
+        default=None,
+        help="Número de processos em paralelo (padrão: número de CPUs)",
+    )
+    parser.add_argument(
+        "--tolerancia",
+        type=float,
+        default=TOLERANCIA_SIMPLIFICACAO,
+        help="Tolerância de simplificação das geometrias em graus (0 desativa)",
+    )
+    args = parser.parse_args()
+
+    estados = sorted(SIGLAS_UF) if args.todos else sorted(set(args.estados))
+
+    manifesto_anterior = _ler_manifesto()
+    dir_anterior = (
+        os.path.join(dir_versoes, manifesto_anterior["versao"])
+        if manifesto_anterior
+        else None
+    )
+    id_versao = datetime.now().strftime("%Y%m%dT%H%M%S")
+    dir_versao = os.path.join(dir_versoes, id_versao)
+    # Falha se a versão já existe: uma versão publicada nunca é regravada
+    os.makedirs(dir_versao)
+
+    console.print(
+        f"Processando estados: {[SIGLAS_UF[e] for e in estados]} (versão {id_versao})"
+    )
+
+    # Vizinhança a partir das geometrias originais de todo o país (a
+    # simplificação pode abrir frestas entre municípios vizinhos)
+    brasil_gdf = carregar_municipios_brasil()
+    gravar_vizinhanca(brasil_gdf, estados, dir_versao, dir_anterior)
+
+    # CSVs nacionais e malha municipal lidos uma vez aqui, não uma vez por processo
+    with (
+        tempfile.TemporaryDirectory(prefix="sysdata-") as dir_fatias,
+        ProcessPoolExecutor(max_workers=args.processos) as executor,
+    ):
+        fatias = particionar_entradas(estados, dir_fatias)
+        particionar_geometrias(brasil_gdf, estados, dir_fatias, fatias)
+        del brasil_gdf
+        futuros = {
+            executor.submit(
+                processar_estado,
+                code_state,
+                args.tolerancia,
+                dir_versao,
+                fatias[code_state],
+            ): code_state
+            for code_state in estados
+        }
+        for futuro in as_completed(futuros):
+            path_particao, n_linhas = futuro.result()
+            console.print(
+                f"[{SIGLAS_UF[futuros[futuro]]}] Partição pronta: {n_linhas} linhas"
+            )
+
+    # Estados não reprocessados seguem com os artefatos da versão anterior
+    herdados = [
+        code_state
+        for code_state in (manifesto_anterior or {}).get("estados", [])
+        if code_state not in estados
+    ]
+    for code_state in herdados:
+        herdar_estado(code_state, dir_anterior, dir_versao)
+
+    publicar(id_versao, estados + herdados)
+    remover_versoes_antigas(id_versao)
+
+    console.print(f"Versão {id_versao} publicada em {path_manifesto}")